@@ -1,66 +1,539 @@
-def agent_move(state, player):
-    best_score = -float("inf")
-    best_move = None
-    for i in range(3):
-        for j in range(3):
-            if state[i][j] == "":
-                state[i][j] = player
-                score = minimax(state, 0, False, player)
-                state[i][j] = ""
-                if score > best_score:
-                    best_score = score
-                    best_move = (i, j)
-    return best_move
-
-
-def minimax(state, depth, is_maximizing, player):
-    if is_win(state, "X" if player == "O" else "O"):
-        return -1
-    if is_win(state, player):
-        return 1
-    if is_end(state):
-        return 0
-
-    if is_maximizing:
-        best_score = -float("inf")
-        for i in range(3):
-            for j in range(3):
-                if state[i][j] == "":
-                    state[i][j] = player
-                    score = minimax(state, depth + 1, False, player)
-                    state[i][j] = ""
-                    best_score = max(score, best_score)
-        return best_score
-    else:
-        best_score = float("inf")
-        for i in range(3):
-            for j in range(3):
-                if state[i][j] == "":
-                    state[i][j] = "O" if player == "X" else "X"
-                    score = minimax(state, depth + 1, True, player)
-                    state[i][j] = ""
-                    best_score = min(score, best_score)
-        return best_score
-
-
-def is_win(state, player):
-    if state[0][0] == state[0][1] == state[0][2] == player:
-        return True
-    if state[1][0] == state[1][1] == state[1][2] == player:
-        return True
-    if state[2][0] == state[2][1] == state[2][2] == player:
-        return True
-    if state[0][0] == state[1][0] == state[2][0] == player:
-        return True
-    if state[0][1] == state[1][1] == state[2][1] == player:
-        return True
-    if state[0][2] == state[1][2] == state[2][2] == player:
-        return True
-    if state[0][0] == state[1][1] == state[2][2] == player:
-        return True
-    if state[0][2] == state[1][1] == state[2][0] == player:
-        return True
-    return False
+import argparse
+import concurrent.futures
+import functools
+import math
+import mmap
+import os
+import random
+import sys
+import time
+
+# transposition table flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# perfect-play table: one byte per base-3 position number, the outcome for
+# the side to move in the high nibble and the best cell in the low nibble
+TABLE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "tic_tac_toe_table.bin"
+)
+LOSS, DRAW, WIN = 0, 1, 2
+NO_MOVE = 15
+UNREACHED = 0xFF
+
+
+class Game:
+    """Geometry of an N x N board where k in a row wins.
+
+    Cells are numbered row by row, so a position is a pair of integer
+    bitboards (one per player) and a line is a precomputed bit mask.
+    """
+
+    def __init__(self, n=3, k=None):
+        self.n = n
+        self.k = k or n
+        self.size = n * n
+        self.full = (1 << self.size) - 1
+
+        self.win_masks = []
+        for i in range(n):
+            for j in range(n):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i, end_j = i + di * (self.k - 1), j + dj * (self.k - 1)
+                    if not (0 <= end_i < n and 0 <= end_j < n):
+                        continue
+                    mask = 0
+                    for step in range(self.k):
+                        mask |= 1 << ((i + di * step) * n + j + dj * step)
+                    self.win_masks.append(mask)
+
+        # only the lines through the last move can have been completed by it
+        self.cell_masks = [
+            [mask for mask in self.win_masks if mask >> cell & 1]
+            for cell in range(self.size)
+        ]
+        # cells lying on more lines are tried first
+        self.move_order = sorted(
+            range(self.size), key=lambda cell: -len(self.cell_masks[cell])
+        )
+
+        # the 8 symmetries of the square as cell permutations
+        self.symmetries = []
+        for rotation in range(4):
+            for flip in (False, True):
+                perm = []
+                for cell in range(self.size):
+                    i, j = divmod(cell, n)
+                    if flip:
+                        j = n - 1 - j
+                    for _ in range(rotation):
+                        i, j = j, n - 1 - i
+                    perm.append(i * n + j)
+                self.symmetries.append(perm)
+        self.inverse = [
+            [perm.index(cell) for cell in range(self.size)]
+            for perm in self.symmetries
+        ]
+        self.symmetry_bits = [
+            [1 << target for target in perm] for perm in self.symmetries
+        ]
+
+    def is_win(self, bits, cell):
+        for mask in self.cell_masks[cell]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def has_win(self, bits):
+        for mask in self.win_masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def transform(self, bits, symmetry):
+        table = self.symmetry_bits[symmetry]
+        result = 0
+        while bits:
+            low = bits & -bits
+            result |= table[low.bit_length() - 1]
+            bits ^= low
+        return result
+
+    def canonical(self, me, opp):
+        # fold the 8 symmetric copies of a position into one table key
+        best_key, best_symmetry = None, 0
+        for symmetry in range(8):
+            key = (self.transform(me, symmetry) << self.size) | self.transform(
+                opp, symmetry
+            )
+            if best_key is None or key < best_key:
+                best_key, best_symmetry = key, symmetry
+        return best_key, best_symmetry
+
+    def evaluate(self, me, opp):
+        # static score for depth-limited search, always strictly inside (-1, 1)
+        score = 0
+        for mask in self.win_masks:
+            if not opp & mask:
+                score += (me & mask).bit_count()
+            elif not me & mask:
+                score -= (opp & mask).bit_count()
+        return score / (len(self.win_masks) * self.k + 1)
+
+
+class AlphaBetaSearch:
+    """Negamax with alpha-beta cutoffs and a symmetry-folded transposition table.
+
+    A win is scored 1 + the number of empty cells left, so quicker wins score
+    higher and every score depends only on the position, never on the path.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.table = {}
+        self.nodes = 0
+
+    def negamax(self, me, opp, depth, alpha, beta):
+        game = self.game
+        self.nodes += 1
+        empty = game.full & ~(me | opp)
+        if not empty:
+            return 0, None
+        empties = empty.bit_count()
+        depth = min(depth, empties)
+        if depth == 0:
+            return game.evaluate(me, opp), None
+
+        alpha_orig = alpha
+        key, symmetry = game.canonical(me, opp)
+        entry = self.table.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, flag, value, move = entry
+            tt_move = game.inverse[symmetry][move]
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value, tt_move
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                elif flag == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, tt_move
+
+        moves = [cell for cell in game.move_order if empty >> cell & 1]
+        if tt_move is not None:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        else:
+            # an immediate win cannot be beaten, try it before anything else
+            for cell in moves:
+                if game.is_win(me | 1 << cell, cell):
+                    moves.remove(cell)
+                    moves.insert(0, cell)
+                    break
+
+        best_value, best_move = -float("inf"), moves[0]
+        for cell in moves:
+            bit = 1 << cell
+            if game.is_win(me | bit, cell):
+                value = empties
+            else:
+                value = -self.negamax(opp, me | bit, depth - 1, -beta, -alpha)[0]
+            if value > best_value:
+                best_value, best_move = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (
+            depth,
+            flag,
+            best_value,
+            game.symmetries[symmetry][best_move],
+        )
+        return best_value, best_move
+
+    def best_move(self, me, opp, max_depth=None):
+        # iterative deepening fills the table with good move orderings
+        empties = (self.game.full & ~(me | opp)).bit_count()
+        max_depth = empties if max_depth is None else min(max_depth, empties)
+        value, move = 0, None
+        for depth in range(1, max_depth + 1):
+            value, move = self.negamax(me, opp, depth, -float("inf"), float("inf"))
+            if value >= 1 or value <= -1:
+                # a forced result was found, deeper search cannot change it
+                break
+        return value, move
+
+
+@functools.lru_cache(maxsize=None)
+def get_search(n, k):
+    # shared per board geometry so the table is reused between moves
+    return AlphaBetaSearch(Game(n, k))
+
+
+def to_bitboards(state, player):
+    me, opp = 0, 0
+    n = len(state)
+    for i in range(n):
+        for j in range(n):
+            if state[i][j] == player:
+                me |= 1 << (i * n + j)
+            elif state[i][j] != "":
+                opp |= 1 << (i * n + j)
+    return me, opp
+
+
+def position_index(me, opp, size=9):
+    # base-3 position number: 0 empty, 1 side to move, 2 opponent
+    index = 0
+    for cell in range(size - 1, -1, -1):
+        index *= 3
+        if me >> cell & 1:
+            index += 1
+        elif opp >> cell & 1:
+            index += 2
+    return index
+
+
+def build_table(path=TABLE_PATH):
+    game = Game(3)
+    search = AlphaBetaSearch(game)
+    table = bytearray([UNREACHED]) * 3**game.size
+
+    # walk every position reachable from the empty board
+    stack = [(0, 0)]
+    reached = 0
+    while stack:
+        me, opp = stack.pop()
+        index = position_index(me, opp)
+        if table[index] != UNREACHED:
+            continue
+        reached += 1
+        empty = game.full & ~(me | opp)
+        if game.has_win(opp):
+            table[index] = LOSS << 4 | NO_MOVE
+            continue
+        if not empty:
+            table[index] = DRAW << 4 | NO_MOVE
+            continue
+
+        value, move = search.negamax(
+            me, opp, game.size, -float("inf"), float("inf")
+        )
+        outcome = WIN if value > 0 else LOSS if value < 0 else DRAW
+        table[index] = outcome << 4 | move
+        for cell in range(game.size):
+            if empty >> cell & 1:
+                stack.append((opp, me | 1 << cell))
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(table)
+    os.replace(temp_path, path)
+    return reached
+
+
+@functools.lru_cache(maxsize=None)
+def load_table(path=TABLE_PATH):
+    # memory-mapped on first use, None when the table has not been built
+    try:
+        with open(path, "rb") as f:
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+    if len(table) != 3**9:
+        table.close()
+        return None
+    return table
+
+
+def table_move(me, opp):
+    table = load_table()
+    if table is None:
+        return None
+    entry = table[position_index(me, opp)]
+    if entry == UNREACHED or entry & 15 == NO_MOVE:
+        return None
+    return entry & 15
+
+
+def agent_move(state, player, k=None, max_depth=None, use_table=True):
+    n = len(state)
+    me, opp = to_bitboards(state, player)
+    if use_table and n == 3 and (k or n) == 3:
+        move = table_move(me, opp)
+        if move is not None:
+            return divmod(move, n)
+
+    # no table for this board, fall back to live search
+    search = get_search(n, k or n)
+    _, move = search.best_move(me, opp, max_depth)
+    if move is None:
+        return None
+    return divmod(move, n)
+
+
+class MCTSNode:
+    __slots__ = ("me", "opp", "result", "untried", "children", "visits", "total")
+
+    def __init__(self, game, me, opp, lost=False):
+        # `me` is the side to move, `total` is the reward of the side that
+        # moved into this node
+        self.me, self.opp = me, opp
+        empty = game.full & ~(me | opp)
+        if lost:
+            self.result = 0.0
+        elif not empty:
+            self.result = 0.5
+        else:
+            self.result = None
+        self.untried = []
+        if self.result is None:
+            self.untried = [cell for cell in range(game.size) if empty >> cell & 1]
+        self.children = {}
+        self.visits = 0
+        self.total = 0.0
+
+
+def rollout(game, me, opp, rng):
+    # uniformly random playout, reward for the side to move
+    empty = game.full & ~(me | opp)
+    cells = [cell for cell in range(game.size) if empty >> cell & 1]
+    rng.shuffle(cells)
+    my_turn = True
+    for cell in cells:
+        if my_turn:
+            me |= 1 << cell
+            if game.is_win(me, cell):
+                return 1.0
+        else:
+            opp |= 1 << cell
+            if game.is_win(opp, cell):
+                return 0.0
+        my_turn = not my_turn
+    return 0.5
+
+
+class MCTSAgent:
+    """UCT search for boards too large for exhaustive search.
+
+    Each leaf is scored with a batch of random rollouts. With workers > 1 the
+    other processes grow independent trees from the same root and their root
+    statistics are merged (root parallelization). A playout budget is for
+    the whole move and split evenly across the processes, the remainder
+    going to the local tree, and each share is rounded up to whole batches;
+    a time limit applies to each process. The local tree is kept between
+    moves and re-rooted at the position actually reached.
+    """
+
+    def __init__(
+        self, n=3, k=None, exploration=1.4, batch_size=8, workers=1, seed=None
+    ):
+        self.n, self.k = n, k or n
+        self.game = Game(n, self.k)
+        self.exploration = exploration
+        self.batch_size = batch_size
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.root = None
+        self.pool = None
+        self.last_stats = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def reroot(self, me, opp):
+        # look for the position among the nodes reached since the last search
+        frontier = [self.root] if self.root is not None else []
+        for _ in range(3):
+            for node in frontier:
+                if node.me == me and node.opp == opp:
+                    return node
+            frontier = [
+                child for node in frontier for child in node.children.values()
+            ]
+        return MCTSNode(self.game, me, opp)
+
+    def iterate(self, root):
+        game, batch_size = self.game, self.batch_size
+        node, path = root, [root]
+        while node.result is None and not node.untried:
+            scale = self.exploration * math.sqrt(math.log(node.visits))
+            node = max(
+                node.children.values(),
+                key=lambda child: child.total / child.visits
+                + scale / math.sqrt(child.visits),
+            )
+            path.append(node)
+
+        if node.result is None:
+            # expand one random untried move
+            untried = node.untried
+            index = self.rng.randrange(len(untried))
+            untried[index], untried[-1] = untried[-1], untried[index]
+            cell = untried.pop()
+            me = node.me | 1 << cell
+            child = MCTSNode(game, node.opp, me, game.is_win(me, cell))
+            node.children[cell] = child
+            node = child
+            path.append(node)
+
+        if node.result is not None:
+            reward = node.result * batch_size
+        else:
+            reward = 0.0
+            for _ in range(batch_size):
+                reward += rollout(game, node.me, node.opp, self.rng)
+
+        for node in reversed(path):
+            node.visits += batch_size
+            node.total += batch_size - reward
+            reward = batch_size - reward
+
+    def run(self, root, time_limit=None, playouts=None):
+        if time_limit is None and playouts is None:
+            time_limit = 1.0
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        done = 0
+        while root.result is None:
+            if playouts is not None and done >= playouts:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.iterate(root)
+            done += self.batch_size
+        return done
+
+    def search(self, me, opp, time_limit=None, playouts=None):
+        start = time.perf_counter()
+        root = self.reroot(me, opp)
+        futures = []
+        local_playouts = worker_playouts = playouts
+        if playouts is not None:
+            worker_playouts = playouts // self.workers
+            local_playouts = playouts - worker_playouts * (self.workers - 1)
+        if self.workers > 1 and worker_playouts != 0:
+            if self.pool is None:
+                self.pool = concurrent.futures.ProcessPoolExecutor(
+                    self.workers - 1
+                )
+            futures = [
+                self.pool.submit(
+                    _mcts_worker,
+                    self.n,
+                    self.k,
+                    self.exploration,
+                    self.batch_size,
+                    me,
+                    opp,
+                    time_limit,
+                    worker_playouts,
+                    self.rng.getrandbits(64),
+                )
+                for _ in range(self.workers - 1)
+            ]
+
+        total_playouts = self.run(root, time_limit, local_playouts)
+        visits = {cell: child.visits for cell, child in root.children.items()}
+        for future in futures:
+            worker_visits, worker_playouts = future.result()
+            total_playouts += worker_playouts
+            for cell, count in worker_visits.items():
+                visits[cell] = visits.get(cell, 0) + count
+
+        elapsed = time.perf_counter() - start
+        self.last_stats = {
+            "playouts": total_playouts,
+            "seconds": elapsed,
+            "playouts_per_second": total_playouts / elapsed if elapsed else 0.0,
+            "root_visits": root.visits,
+        }
+        if not visits:
+            self.root = root
+            return None
+        move = max(visits, key=visits.get)
+        # keep the subtree under our move for the next call
+        self.root = root.children.get(move)
+        return move
+
+
+def _mcts_worker(
+    n, k, exploration, batch_size, me, opp, time_limit, playouts, seed
+):
+    agent = MCTSAgent(n, k, exploration, batch_size, seed=seed)
+    root = MCTSNode(agent.game, me, opp)
+    done = agent.run(root, time_limit, playouts)
+    return {cell: child.visits for cell, child in root.children.items()}, done
+
+
+@functools.lru_cache(maxsize=None)
+def get_mcts_agent(n, k, workers=1):
+    return MCTSAgent(n, k, workers=workers)
+
+
+def mcts_move(state, player, k=None, time_limit=None, playouts=None, workers=1):
+    n = len(state)
+    agent = get_mcts_agent(n, k or n, workers)
+    me, opp = to_bitboards(state, player)
+    move = agent.search(me, opp, time_limit, playouts)
+    if move is None:
+        return None
+    return divmod(move, n)
+
+
+def is_win(state, player, k=None):
+    n = len(state)
+    me, _ = to_bitboards(state, player)
+    return get_search(n, k or n).game.has_win(me)
 
 
 def is_end(state):
@@ -72,7 +545,25 @@ def is_end(state):
 
 
 if __name__ == "__main__":
-    board = [["", "", ""], ["", "", ""], ["", "", ""]]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("n", type=int, nargs="?", default=3)
+    parser.add_argument("k", type=int, nargs="?", default=None)
+    parser.add_argument("max_depth", type=int, nargs="?", default=None)
+    parser.add_argument("--build-table", action="store_true")
+    parser.add_argument("--mcts", type=float, metavar="SECONDS", default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.build_table:
+        reached = build_table()
+        print(f"Stored {reached} reachable positions in {TABLE_PATH}")
+        sys.exit(0)
+
+    n = args.n
+    k = args.k or n
+    max_depth = args.max_depth
+
+    board = [["" for _ in range(n)] for _ in range(n)]
     print("Initial state:")
     for row in board:
         print(row)
@@ -83,10 +574,19 @@ if __name__ == "__main__":
             x, y = map(
                 int, input(f"Player {current_player} move (row column): ").split()
             )
+        elif args.mcts is not None:
+            x, y = mcts_move(
+                board, current_player, k, args.mcts, workers=args.workers
+            )
+            stats = get_mcts_agent(n, k, args.workers).last_stats
+            print(
+                f"{stats['playouts']} playouts in {stats['seconds']:.2f}s "
+                f"({stats['playouts_per_second']:.0f}/s)"
+            )
         else:
-            x, y = agent_move(board, current_player)
+            x, y = agent_move(board, current_player, k, max_depth)
 
-        if board[x][y] != "":
+        if not (0 <= x < n and 0 <= y < n) or board[x][y] != "":
             print("Invalid move")
             continue
         board[x][y] = current_player
@@ -94,7 +594,7 @@ if __name__ == "__main__":
         for row in board:
             print(row)
 
-        if is_win(board, current_player):
+        if is_win(board, current_player, k):
             print(f"Player {current_player} won!")
             break
 
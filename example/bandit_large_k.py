@@ -0,0 +1,245 @@
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+
+class TournamentTree:
+    """Max tournament over arm estimates.
+
+    Leaf i holds arm i's estimate and every internal node holds the arm that
+    wins its subtree, so the best arm is read at the root and a changed
+    estimate replays only the log2(K) matches on its path.
+    """
+
+    def __init__(self, values):
+        num_leaves = len(values)
+        self.size = size = 1 << max(0, (num_leaves - 1).bit_length())
+        self.values = np.full(size, -np.inf)
+        self.values[:num_leaves] = values
+        self.winner = np.zeros(2 * size, dtype=np.int64)
+        self.winner[size:] = np.arange(size)
+        level = size // 2
+        while level:
+            self._replay(np.arange(level, 2 * level))
+            level //= 2
+        self.values_view = memoryview(self.values)
+        self.winner_view = memoryview(self.winner)
+
+    def _replay(self, nodes):
+        left, right = self.winner[2 * nodes], self.winner[2 * nodes + 1]
+        self.winner[nodes] = np.where(
+            self.values[left] >= self.values[right], left, right
+        )
+
+    def best(self):
+        return self.winner_view[1]
+
+    def update(self, leaf, value):
+        values, winner = self.values_view, self.winner_view
+        values[leaf] = value
+        node = (leaf + self.size) >> 1
+        while node:
+            left, right = winner[2 * node], winner[2 * node + 1]
+            winner[node] = left if values[left] >= values[right] else right
+            node >>= 1
+
+    def update_many(self, leaves, values):
+        # replay each touched level once, however many leaves share it
+        leaves = np.asarray(leaves, dtype=np.int64)
+        if not len(leaves):
+            return
+        self.values[leaves] = values
+        nodes = np.unique((leaves + self.size) >> 1)
+        while nodes[-1]:
+            self._replay(nodes)
+            nodes = np.unique(nodes >> 1)
+
+
+class IndexedEpsilonGreedyPolicy:
+    """Epsilon-greedy for catalogs with 10^5-10^6 arms.
+
+    The exploit step reads the best arm from a TournamentTree instead of
+    scanning all estimates. Estimates can be:
+
+    - "average": the sample mean of every reward, as in
+      epsilson_greedy_strategy.py,
+    - "discounted": rewards weighted by discount ** age. Decay is applied
+      lazily when an arm is updated, since uniform decay leaves the other
+      arms' ratios unchanged,
+    - "window": the mean over the last `window` pulls across all arms. Each
+      pull changes at most the pulled arm and the arm whose pull falls out.
+
+    Every update touches O(1) arms and so costs O(log K).
+    """
+
+    def __init__(
+        self,
+        num_arms,
+        epsilon=0.1,
+        estimate="average",
+        discount=0.999,
+        window=10000,
+        seed=None,
+    ):
+        if estimate not in ("average", "discounted", "window"):
+            raise ValueError(f"Unknown estimate {estimate!r}")
+        self.num_arms = num_arms
+        self.epsilon = epsilon
+        self.estimate = estimate
+        self.discount = discount
+        self.window = window
+        self.time = 0
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+
+        # (weighted) pull counts and reward sums per arm
+        self.num_times_pulled = np.zeros(num_arms)
+        self.reward_sums = np.zeros(num_arms)
+        self.last_update = np.zeros(num_arms, dtype=np.int64)
+        self.tree = TournamentTree(np.zeros(num_arms))
+        if estimate == "window":
+            self.window_arms = np.full(window, -1, dtype=np.int64)
+            self.window_rewards = np.zeros(window)
+        self.counts_view = memoryview(self.num_times_pulled)
+        self.sums_view = memoryview(self.reward_sums)
+        self.last_view = memoryview(self.last_update)
+
+    @property
+    def estimated_probs(self):
+        counts = self.num_times_pulled
+        return np.divide(
+            self.reward_sums, counts, out=np.zeros(self.num_arms), where=counts > 0
+        )
+
+    @property
+    def best_arm(self):
+        return self.tree.best()
+
+    def select(self):
+        if self.rng.random() < self.epsilon:
+            return self.rng.randrange(self.num_arms)
+        return self.tree.best()
+
+    def select_batch(self, size):
+        explore = self.np_rng.random(size) < self.epsilon
+        arms = np.full(size, self.tree.best(), dtype=np.int64)
+        arms[explore] = self.np_rng.integers(self.num_arms, size=int(explore.sum()))
+        return arms
+
+    def _add(self, arm, count, reward):
+        counts, sums = self.counts_view, self.sums_view
+        counts[arm] += count
+        sums[arm] += reward
+        self.tree.update(arm, sums[arm] / counts[arm] if counts[arm] > 0 else 0.0)
+
+    def update(self, arm, reward):
+        with self.lock:
+            self.time += 1
+            if self.estimate == "discounted":
+                decay = self.discount ** (self.time - self.last_view[arm])
+                self.counts_view[arm] *= decay
+                self.sums_view[arm] *= decay
+                self.last_view[arm] = self.time
+            elif self.estimate == "window":
+                slot = self.time % self.window
+                old_arm = int(self.window_arms[slot])
+                if old_arm >= 0:
+                    self._add(old_arm, -1, -self.window_rewards[slot])
+                self.window_arms[slot] = arm
+                self.window_rewards[slot] = reward
+            self._add(arm, 1, reward)
+
+    def update_batch(self, arms, rewards):
+        arms = np.asarray(arms, dtype=np.int64)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        size = len(arms)
+        with self.lock:
+            start = self.time
+            self.time += size
+            if self.estimate == "discounted":
+                # observation i of the batch is size - 1 - i steps old at the end
+                weights = self.discount ** np.arange(size - 1, -1, -1, dtype=np.float64)
+                touched = np.unique(arms)
+                decay = self.discount ** (self.time - self.last_update[touched])
+                self.num_times_pulled[touched] *= decay
+                self.reward_sums[touched] *= decay
+                self.last_update[touched] = self.time
+                np.add.at(self.num_times_pulled, arms, weights)
+                np.add.at(self.reward_sums, arms, weights * rewards)
+            elif self.estimate == "window":
+                if size > self.window:
+                    arms, rewards = arms[-self.window :], rewards[-self.window :]
+                first = start + size - len(arms) + 1
+                slots = (first + np.arange(len(arms))) % self.window
+                old_arms = self.window_arms[slots]
+                evicted = old_arms >= 0
+                np.subtract.at(self.num_times_pulled, old_arms[evicted], 1)
+                old_rewards = self.window_rewards[slots][evicted]
+                np.subtract.at(self.reward_sums, old_arms[evicted], old_rewards)
+                self.window_arms[slots] = arms
+                self.window_rewards[slots] = rewards
+                np.add.at(self.num_times_pulled, arms, 1)
+                np.add.at(self.reward_sums, arms, rewards)
+                touched = np.unique(np.concatenate([arms, old_arms[evicted]]))
+            else:
+                np.add.at(self.num_times_pulled, arms, 1)
+                np.add.at(self.reward_sums, arms, rewards)
+                touched = np.unique(arms)
+            counts = self.num_times_pulled[touched]
+            estimates = np.divide(
+                self.reward_sums[touched],
+                counts,
+                out=np.zeros(len(touched)),
+                where=counts > 0,
+            )
+            self.tree.update_many(touched, estimates)
+
+
+def benchmark(sizes, num_pulls=20000, seed=0):
+    # per-decision cost of an argmax scan against the tournament tree
+    rng = np.random.default_rng(seed)
+    for num_arms in sizes:
+        true_probs = rng.random(num_arms)
+        rewards = rng.random(num_pulls)
+
+        estimated_probs = np.zeros(num_arms)
+        num_times_pulled = np.zeros(num_arms)
+        scan_rng = random.Random(seed)
+        start = time.perf_counter()
+        for i in range(num_pulls):
+            if scan_rng.random() < 0.1:
+                arm = scan_rng.randrange(num_arms)
+            else:
+                arm = int(np.argmax(estimated_probs))
+            reward = rewards[i] < true_probs[arm]
+            num_times_pulled[arm] += 1
+            estimated_probs[arm] += (
+                reward - estimated_probs[arm]
+            ) / num_times_pulled[arm]
+        scan = (time.perf_counter() - start) / num_pulls
+
+        policy = IndexedEpsilonGreedyPolicy(num_arms, seed=seed)
+        start = time.perf_counter()
+        for i in range(num_pulls):
+            arm = policy.select()
+            policy.update(arm, rewards[i] < true_probs[arm])
+        indexed = (time.perf_counter() - start) / num_pulls
+
+        print(
+            f"K={num_arms:>9,}  argmax scan {scan * 1e6:8.1f} us/decision  "
+            f"tournament tree {indexed * 1e6:6.1f} us/decision"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6]
+    )
+    parser.add_argument("--pulls", type=int, default=20000)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.pulls)
@@ -0,0 +1,162 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+
+def sherman_morrison(A_inv, x):
+    # (A + x x^T)^-1 from A^-1 in O(d^2), updated in place
+    A_inv_x = A_inv @ x
+    A_inv -= np.outer(A_inv_x, A_inv_x) / (1.0 + x @ A_inv_x)
+
+
+class LinUCBPolicy:
+    """Disjoint LinUCB: one ridge regression per arm on that arm's features.
+
+    Each arm keeps A^-1 (d x d) and theta = A^-1 b, current after every
+    reward through a Sherman-Morrison rank-1 update instead of a fresh
+    inverse. select() scores every arm with one batched contraction over the
+    stacked (K, d, d) inverses.
+    """
+
+    def __init__(self, num_arms, dim, alpha=1.0, ridge=1.0):
+        self.num_arms = num_arms
+        self.dim = dim
+        self.alpha = alpha
+        self.A_inv = np.tile(np.eye(dim) / ridge, (num_arms, 1, 1))
+        self.b = np.zeros((num_arms, dim))
+        self.theta = np.zeros((num_arms, dim))
+        self.lock = threading.Lock()
+
+    def scores(self, contexts):
+        # contexts: (K, d) per-arm features, or (d,) shared by every arm
+        contexts = np.broadcast_to(contexts, (self.num_arms, self.dim))
+        mean = np.einsum("kd,kd->k", self.theta, contexts)
+        A_inv_x = np.matmul(self.A_inv, contexts[:, :, None])[:, :, 0]
+        variance = np.einsum("kd,kd->k", contexts, A_inv_x)
+        return mean + self.alpha * np.sqrt(variance)
+
+    def select(self, contexts):
+        return int(np.argmax(self.scores(contexts)))
+
+    def select_batch(self, contexts):
+        # contexts: (B, d) requests whose features are shared across arms
+        mean = contexts @ self.theta.T
+        # one (K, B, d) product against every arm's inverse
+        A_inv_x = np.matmul(contexts, self.A_inv)
+        variance = np.einsum("kbd,bd->bk", A_inv_x, contexts)
+        return np.argmax(mean + self.alpha * np.sqrt(variance), axis=1)
+
+    def update(self, arm, x, reward):
+        x = np.asarray(x, dtype=np.float64)
+        with self.lock:
+            sherman_morrison(self.A_inv[arm], x)
+            self.b[arm] += reward * x
+            self.theta[arm] = self.A_inv[arm] @ self.b[arm]
+
+
+class HybridLinUCBPolicy:
+    """Hybrid LinUCB (Li et al., 2010): shared coefficients plus per-arm ones.
+
+    z holds features whose effect is shared by all arms (k of them) and x the
+    arm-specific ones (d). The per-arm inverses follow Sherman-Morrison. The
+    shared k x k system absorbs a change of rank up to 2k on every update,
+    so it is re-inverted, which stays cheap while k is small.
+    """
+
+    def __init__(self, num_arms, shared_dim, dim, alpha=1.0, ridge=1.0):
+        self.num_arms = num_arms
+        self.shared_dim = shared_dim
+        self.dim = dim
+        self.alpha = alpha
+        self.A0 = np.eye(shared_dim) * ridge
+        self.A0_inv = np.eye(shared_dim) / ridge
+        self.b0 = np.zeros(shared_dim)
+        self.beta = np.zeros(shared_dim)
+        self.A_inv = np.tile(np.eye(dim) / ridge, (num_arms, 1, 1))
+        self.B = np.zeros((num_arms, dim, shared_dim))
+        self.b = np.zeros((num_arms, dim))
+        self.lock = threading.Lock()
+
+    def scores(self, shared, contexts):
+        # shared: (K, k) or (k,), contexts: (K, d) or (d,)
+        z = np.broadcast_to(shared, (self.num_arms, self.shared_dim))
+        x = np.broadcast_to(contexts, (self.num_arms, self.dim))
+        A_inv, B, A0_inv = self.A_inv, self.B, self.A0_inv
+
+        A_inv_x = np.matmul(A_inv, x[:, :, None])[:, :, 0]
+        theta = np.matmul(A_inv, (self.b - B @ self.beta)[:, :, None])[:, :, 0]
+        Bt_A_inv_x = np.einsum("kdj,kd->kj", B, A_inv_x)
+        A0_inv_z = z @ A0_inv
+        variance = (
+            np.einsum("kj,kj->k", z, A0_inv_z)
+            - 2 * np.einsum("kj,kj->k", A0_inv_z, Bt_A_inv_x)
+            + np.einsum("kd,kd->k", x, A_inv_x)
+            + np.einsum("kj,kj->k", Bt_A_inv_x @ A0_inv, Bt_A_inv_x)
+        )
+        mean = z @ self.beta + np.einsum("kd,kd->k", x, theta)
+        return mean + self.alpha * np.sqrt(np.maximum(variance, 0.0))
+
+    def select(self, shared, contexts):
+        return int(np.argmax(self.scores(shared, contexts)))
+
+    def update(self, arm, z, x, reward):
+        z = np.asarray(z, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64)
+        with self.lock:
+            A_inv, B, b = self.A_inv[arm], self.B[arm], self.b[arm]
+            Bt_A_inv = B.T @ A_inv
+            self.A0 += Bt_A_inv @ B
+            self.b0 += Bt_A_inv @ b
+
+            sherman_morrison(A_inv, x)
+            B += np.outer(x, z)
+            b += reward * x
+
+            Bt_A_inv = B.T @ A_inv
+            self.A0 += np.outer(z, z) - Bt_A_inv @ B
+            self.b0 += reward * z - Bt_A_inv @ b
+            self.A0_inv = np.linalg.inv(self.A0)
+            self.beta = self.A0_inv @ self.b0
+
+
+def benchmark(dims, num_arms=20, num_pulls=2000, seed=0):
+    # synthetic linear rewards: decisions per second and reward against random
+    rng = np.random.default_rng(seed)
+    for dim in dims:
+        true_theta = rng.normal(size=(num_arms, dim)) / np.sqrt(dim)
+        contexts = rng.normal(size=(num_pulls, dim))
+        noise = rng.normal(scale=0.1, size=num_pulls)
+        policy = LinUCBPolicy(num_arms, dim, alpha=0.5)
+
+        total = 0.0
+        start = time.perf_counter()
+        for t in range(num_pulls):
+            x = contexts[t]
+            arm = policy.select(x)
+            reward = true_theta[arm] @ x + noise[t]
+            policy.update(arm, x, reward)
+            total += reward
+        elapsed = time.perf_counter() - start
+
+        best = (contexts @ true_theta.T).max(axis=1).sum()
+        random_total = (contexts @ true_theta.T).mean(axis=1).sum()
+        batch = contexts[:256]
+        start = time.perf_counter()
+        policy.select_batch(batch)
+        batch_rate = len(batch) / (time.perf_counter() - start)
+        print(
+            f"d={dim:>4}  {num_pulls / elapsed:9,.0f} decisions/s  "
+            f"batched select {batch_rate:11,.0f}/s  "
+            f"reward {total:8.1f} (best {best:.1f}, random {random_total:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dims", type=int, nargs="+", default=[5, 10, 20, 50, 100])
+    parser.add_argument("--arms", type=int, default=20)
+    parser.add_argument("--pulls", type=int, default=2000)
+    args = parser.parse_args()
+    benchmark(args.dims, args.arms, args.pulls)
@@ -0,0 +1,138 @@
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+
+class EpsilonGreedyPolicy:
+    """Epsilon-greedy arm selection for live traffic.
+
+    Pull counts and reward estimates sit in preallocated arrays. The best
+    arm is cached, so select() is O(1) and update() is O(1) unless the
+    current best arm's estimate drops. Updates take a lock, and select()
+    only reads the cached best arm, so any number of threads can share one
+    policy. For high volume, select_batch() and update_batch() amortize the
+    per-call overhead over many decisions.
+    """
+
+    def __init__(self, num_arms, epsilon=0.1, seed=None):
+        self.num_arms = num_arms
+        self.epsilon = epsilon
+        self.num_times_pulled = np.zeros(num_arms, dtype=np.int64)
+        self.estimated_probs = np.zeros(num_arms, dtype=np.float64)
+        # scalar reads and writes through memoryviews skip NumPy's boxing
+        self.counts_view = memoryview(self.num_times_pulled)
+        self.estimates_view = memoryview(self.estimated_probs)
+        self.best_arm = 0
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+
+    def select(self):
+        if self.rng.random() < self.epsilon:
+            return self.rng.randrange(self.num_arms)
+        return self.best_arm
+
+    def select_batch(self, size):
+        explore = self.np_rng.random(size) < self.epsilon
+        arms = np.full(size, self.best_arm, dtype=np.int64)
+        arms[explore] = self.np_rng.integers(self.num_arms, size=int(explore.sum()))
+        return arms
+
+    def update(self, arm, reward):
+        counts, estimates = self.counts_view, self.estimates_view
+        with self.lock:
+            count = counts[arm] + 1
+            counts[arm] = count
+            estimate = estimates[arm]
+            estimate += (reward - estimate) / count
+            estimates[arm] = estimate
+            best = self.best_arm
+            if arm == best:
+                if reward < estimate:
+                    # the leader got worse, someone else may lead now
+                    self.best_arm = int(np.argmax(self.estimated_probs))
+            elif estimate > estimates[best]:
+                self.best_arm = arm
+
+    def update_batch(self, arms, rewards):
+        # delayed feedback for many decisions folded in with two bincounts
+        arms = np.asarray(arms, dtype=np.int64)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        pulls = np.bincount(arms, minlength=self.num_arms)
+        totals = np.bincount(arms, weights=rewards, minlength=self.num_arms)
+        with self.lock:
+            counts = self.num_times_pulled + pulls
+            touched = pulls > 0
+            self.estimated_probs[touched] += (
+                totals[touched] - pulls[touched] * self.estimated_probs[touched]
+            ) / counts[touched]
+            self.num_times_pulled[:] = counts
+            self.best_arm = int(np.argmax(self.estimated_probs))
+
+    def save(self, path):
+        with self.lock:
+            counts = self.num_times_pulled.copy()
+            estimates = self.estimated_probs.copy()
+        # write next to the target and rename so readers never see half a file
+        temp_path = path + ".tmp.npz"
+        np.savez(
+            temp_path,
+            num_times_pulled=counts,
+            estimated_probs=estimates,
+            epsilon=self.epsilon,
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, seed=None):
+        with np.load(path) as data:
+            policy = cls(len(data["estimated_probs"]), float(data["epsilon"]), seed)
+            policy.num_times_pulled[:] = data["num_times_pulled"]
+            policy.estimated_probs[:] = data["estimated_probs"]
+        policy.best_arm = int(np.argmax(policy.estimated_probs))
+        return policy
+
+
+if __name__ == "__main__":
+    true_probs = np.array([0.1, 0.4, 0.02, 0.18, 0.7])
+    rng = np.random.default_rng(0)
+    policy = EpsilonGreedyPolicy(len(true_probs), seed=0)
+
+    num_pulls = 200000
+    rewards = (rng.random((num_pulls, len(true_probs))) < true_probs).tolist()
+    start = time.perf_counter()
+    for i in range(num_pulls):
+        arm = policy.select()
+        policy.update(arm, rewards[i][arm])
+    elapsed = time.perf_counter() - start
+    print(f"select + update: {num_pulls / elapsed:,.0f} decisions/s")
+
+    batch_size = 100000
+    start = time.perf_counter()
+    for _ in range(100):
+        arms = policy.select_batch(batch_size)
+        policy.update_batch(arms, rng.random(batch_size) < true_probs[arms])
+    elapsed = time.perf_counter() - start
+    print(f"batched: {100 * batch_size / elapsed:,.0f} decisions/s")
+
+    def worker():
+        local = np.random.default_rng()
+        for _ in range(20000):
+            arm = policy.select()
+            policy.update(arm, local.random() < true_probs[arm])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    policy.save("bandit_policy.npz")
+    restored = EpsilonGreedyPolicy.load("bandit_policy.npz")
+    os.remove("bandit_policy.npz")
+    print(f"Estimated probs: {restored.estimated_probs}")
+    print(f"Times each bandit was pulled: {restored.num_times_pulled}")
+    print(f"Best bandit: {restored.best_arm}")
@@ -0,0 +1,114 @@
+import argparse
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+STRATEGIES = ["epsilon-greedy", "ucb1", "thompson"]
+
+
+class SimulationResult(NamedTuple):
+    mean_regret: np.ndarray  # (T,) cumulative regret averaged over runs
+    quantiles: np.ndarray  # (len(levels), T) cumulative regret quantiles
+    levels: np.ndarray
+    final_regret: np.ndarray  # (R,) cumulative regret of each run
+    seconds: float
+
+
+def simulate(
+    true_probs,
+    strategy="epsilon-greedy",
+    num_runs=10000,
+    num_pulls=1000,
+    epsilon=0.1,
+    levels=(0.05, 0.25, 0.5, 0.75, 0.95),
+    seed=None,
+):
+    """Play num_runs independent Bernoulli bandits side by side.
+
+    Every pull is one set of array operations over all runs, so the only
+    Python loop is over the num_pulls time steps.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}")
+    rng = np.random.default_rng(seed)
+    true_probs = np.asarray(true_probs, dtype=np.float64)
+    num_bandits = len(true_probs)
+    levels = np.asarray(levels)
+    runs = np.arange(num_runs)
+
+    num_times_pulled = np.zeros((num_runs, num_bandits))
+    estimated_probs = np.zeros((num_runs, num_bandits))
+    successes = np.ones((num_runs, num_bandits))  # Beta(1, 1) priors
+    failures = np.ones((num_runs, num_bandits))
+    regret = np.zeros(num_runs)
+    mean_regret = np.empty(num_pulls)
+    quantiles = np.empty((len(levels), num_pulls))
+    gaps = true_probs.max() - true_probs
+
+    start = time.perf_counter()
+    for t in range(num_pulls):
+        if strategy == "epsilon-greedy":
+            explore = rng.random(num_runs) < epsilon
+            chosen_bandit = np.where(
+                explore,
+                rng.integers(num_bandits, size=num_runs),
+                np.argmax(estimated_probs, axis=1),
+            )
+        elif strategy == "ucb1":
+            if t < num_bandits:
+                # every arm once before the bound is defined
+                chosen_bandit = np.full(num_runs, t)
+            else:
+                bonus = np.sqrt(2 * np.log(t) / num_times_pulled)
+                chosen_bandit = np.argmax(estimated_probs + bonus, axis=1)
+        else:
+            chosen_bandit = np.argmax(rng.beta(successes, failures), axis=1)
+
+        # simulate pulling
+        reward = rng.random(num_runs) < true_probs[chosen_bandit]
+
+        # record
+        num_times_pulled[runs, chosen_bandit] += 1
+        estimated_probs[runs, chosen_bandit] += (
+            reward - estimated_probs[runs, chosen_bandit]
+        ) / num_times_pulled[runs, chosen_bandit]
+        successes[runs, chosen_bandit] += reward
+        failures[runs, chosen_bandit] += ~reward
+
+        regret += gaps[chosen_bandit]
+        mean_regret[t] = regret.mean()
+        quantiles[:, t] = np.quantile(regret, levels)
+
+    return SimulationResult(
+        mean_regret, quantiles, levels, regret, time.perf_counter() - start
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--probs", type=float, nargs="+", default=[0.1, 0.4, 0.02, 0.18, 0.7]
+    )
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("--pulls", type=int, default=1000)
+    parser.add_argument("--epsilon", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    checkpoints = sorted({args.pulls // 10, args.pulls // 2, args.pulls} - {0})
+    for strategy in STRATEGIES:
+        result = simulate(
+            args.probs, strategy, args.runs, args.pulls, args.epsilon, seed=args.seed
+        )
+        print(
+            f"{strategy}: {args.runs} runs x {args.pulls} pulls "
+            f"in {result.seconds:.2f}s"
+        )
+        header = "  ".join(f"q{level:g}" for level in result.levels)
+        print(f"  {'pull':>6}  {'mean':>8}  {header}")
+        for pull in checkpoints:
+            values = "  ".join(
+                f"{value:.1f}" for value in result.quantiles[:, pull - 1]
+            )
+            print(f"  {pull:>6}  {result.mean_regret[pull - 1]:>8.2f}  {values}")
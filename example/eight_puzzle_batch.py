@@ -0,0 +1,191 @@
+import argparse
+import collections
+import concurrent.futures
+import functools
+import itertools
+import math
+import os
+import sys
+import time
+from typing import NamedTuple, Optional
+
+import eight_puzzle_search
+import eight_puzzle_table
+import sliding_puzzle_pdb
+
+
+class BatchResult(NamedTuple):
+    index: int
+    moves: Optional[str]  # blank moves as U/D/L/R, None when unsolvable
+    length: Optional[int]
+    expanded: int  # nodes expanded, or table probes for the "table" strategy
+    seconds: float
+
+
+def parse_instance(line):
+    # "2 8 3 1 6 4 7 0 5" or "2,8,3,1,6,4,7,0,5", read row by row
+    tiles = [int(token) for token in line.replace(",", " ").split()]
+    n = math.isqrt(len(tiles))
+    if n * n != len(tiles) or sorted(tiles) != list(range(n * n)):
+        raise ValueError(f"Not a sliding puzzle: {line.strip()!r}")
+    return [tiles[i * n : (i + 1) * n] for i in range(n)]
+
+
+def read_instances(path):
+    # one instance per line, blank lines and # comments skipped
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield parse_instance(line)
+
+
+def path_moves(path):
+    n = len(path[0])
+    directions = {-n: "U", n: "D", -1: "L", 1: "R"}
+    moves = []
+    blank = [tile for row in path[0] for tile in row].index(0)
+    for board in path[1:]:
+        cell = [tile for row in board for tile in row].index(0)
+        moves.append(directions[cell - blank])
+        blank = cell
+    return "".join(moves)
+
+
+def goal_for(n):
+    # every strategy solves towards the same goal, so results agree
+    return eight_puzzle_search.GOAL if n == 3 else sliding_puzzle_pdb.default_goal(n)
+
+
+@functools.lru_cache(maxsize=None)
+def prepare(strategy, n):
+    # files shared by the workers are built here, in the parent, before any
+    # worker opens them, so no two processes write the same file
+    if strategy == "table":
+        if n != 3:
+            raise ValueError("The distance table only covers the 8-puzzle")
+        eight_puzzle_table.load_table()
+    elif strategy == "ida":
+        goal = goal_for(n)
+        patterns = sliding_puzzle_pdb.DEFAULT_PATTERNS[n]
+        paths = [
+            sliding_puzzle_pdb.database_path(n, number, goal=goal)
+            for number in range(len(patterns))
+        ]
+        if not all(os.path.exists(path) for path in paths):
+            sliding_puzzle_pdb.build_databases(n, goal)
+
+
+@functools.lru_cache(maxsize=None)
+def get_solver(strategy, n):
+    # built once per worker process and reused for every instance it gets
+    if strategy == "table":
+        eight_puzzle_table.load_table()
+        return eight_puzzle_table.solve
+    if strategy == "ida":
+        return sliding_puzzle_pdb.IDAStar(n, goal=goal_for(n)).solve
+    return functools.partial(
+        eight_puzzle_search.solve, strategy=strategy, goal=goal_for(n)
+    )
+
+
+def solve_chunk(strategy, start, boards):
+    results = []
+    for index, board in enumerate(boards, start):
+        begin = time.perf_counter()
+        result = get_solver(strategy, len(board))(board)
+        seconds = time.perf_counter() - begin
+        if result.path is None:
+            results.append(BatchResult(index, None, None, result.expanded, seconds))
+        else:
+            results.append(
+                BatchResult(
+                    index,
+                    path_moves(result.path),
+                    len(result.path) - 1,
+                    result.expanded,
+                    seconds,
+                )
+            )
+    return results
+
+
+def solve_batch(instances, strategy="astar", workers=None, chunk_size=64):
+    """Solve boards across a process pool, yielding results in input order.
+
+    Only a few chunks per worker are in flight at once, so neither the input
+    nor the results are ever held in full.
+    """
+    workers = workers or os.cpu_count() or 1
+    instances = iter(instances)
+    if workers == 1:
+        start = 0
+        while True:
+            chunk = list(itertools.islice(instances, chunk_size))
+            if not chunk:
+                return
+            for board in chunk:
+                prepare(strategy, len(board))
+            yield from solve_chunk(strategy, start, chunk)
+            start += len(chunk)
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        pending = collections.deque()
+        start = 0
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < 2 * workers:
+                chunk = list(itertools.islice(instances, chunk_size))
+                if not chunk:
+                    exhausted = True
+                    break
+                for board in chunk:
+                    prepare(strategy, len(board))
+                pending.append(pool.submit(solve_chunk, strategy, start, chunk))
+                start += len(chunk)
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="file with one board per line, row by row")
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument(
+        "--strategy",
+        default="astar",
+        choices=list(eight_puzzle_search.STRATEGIES) + ["table", "ida"],
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    begin = time.perf_counter()
+    solved = total = 0
+    print("index\tlength\tmoves\texpanded\tseconds", file=output)
+    for result in solve_batch(
+        read_instances(args.input), args.strategy, args.workers, args.chunk_size
+    ):
+        total += 1
+        if result.moves is None:
+            print(
+                f"{result.index}\tunsolvable\t-\t0\t{result.seconds:.6f}",
+                file=output,
+            )
+            continue
+        solved += 1
+        print(
+            f"{result.index}\t{result.length}\t{result.moves or '-'}\t"
+            f"{result.expanded}\t{result.seconds:.6f}",
+            file=output,
+        )
+    elapsed = time.perf_counter() - begin
+    if output is not sys.stdout:
+        output.close()
+    print(
+        f"Solved {solved}/{total} instances in {elapsed:.2f}s "
+        f"({total / elapsed if elapsed else 0:.1f} instances/s)",
+        file=sys.stderr,
+    )
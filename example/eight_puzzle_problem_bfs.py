@@ -1,43 +1,18 @@
-def solver(puzzle, max_level):
-    state = []
-    def dfs(puzzle, level):
-        if puzzle in state:
-            return False
-        if level > max_level:
-            return False
-    
-        state.append(puzzle)
-        
-        print("Level: ", level)
-        for row in puzzle:
-            print(row)
-        print()
-        
-        # Check if goal state is found
-        if puzzle == [[1, 2, 3], [8, 0, 4], [7, 6, 5]]:
-            print("Goal state found!")
-            return True
-        
-        # Find the position of the empty tile
-        for i in range(3):
-            for j in range(3):
-                if puzzle[i][j] == 0:
-                    x, y = i, j
-                    break
-        # iterate over all possible next states
-        move = [[0, 1], [1, 0], [0, -1], [-1, 0]]
-        for m in move:
-            x_, y_ = x + m[0], y + m[1]
-            if 0 <= x_ < 3 and 0 <= y_ < 3:
-                new_puzzle = [row[:] for row in puzzle]
-                new_puzzle[x][y], new_puzzle[x_][y_] = new_puzzle[x_][y_], new_puzzle[x][y]
-                if dfs(new_puzzle, level + 1):
-                    return True
+from eight_puzzle_search import print_board, solve
 
+
+# this script has always run the depth-limited search, with this signature
+def solver(puzzle, max_level, verbose=True):
+    result = solve(puzzle, "iddfs", verbose=verbose, max_depth=max_level)
+    if result.path is None:
         return False
-    
-    return dfs(puzzle, 0)
-    
+    print("Goal state found!")
+    return True
+
+
 if __name__ == "__main__":
     init = [[2, 8, 3], [1, 6, 4], [7, 0, 5]]
-    solver(init, 6)
\ No newline at end of file
+    result = solve(init, "iddfs", max_depth=6)
+    print(f"Solved in {len(result.path) - 1} moves, {result.expanded} nodes expanded")
+    for board in result.path:
+        print_board(board)
@@ -0,0 +1,230 @@
+import collections
+import heapq
+from typing import List, NamedTuple, Optional
+
+GOAL = [[1, 2, 3], [8, 0, 4], [7, 6, 5]]
+
+
+class SearchResult(NamedTuple):
+    path: Optional[List[List[List[int]]]]  # boards from the start to the goal
+    expanded: int
+    max_frontier: int
+
+
+class Puzzle:
+    """Sliding puzzle of up to 4x4 packed into one 64-bit integer.
+
+    Cell i holds its tile in bits 4i..4i+3 and the blank is tile 0, so a move
+    is two shifts and the closed set is a hash table of ints.
+    """
+
+    def __init__(self, goal=GOAL):
+        self.n = len(goal)
+        self.size = self.n * self.n
+        if self.size > 16:
+            raise ValueError("Packed states hold at most 16 cells")
+        self.goal = pack(goal)
+
+        goal_cell = {}
+        for cell in range(self.size):
+            goal_cell[goal[cell // self.n][cell % self.n]] = cell
+        # distance[tile][cell]: Manhattan distance of tile at cell to its goal
+        self.distance = [[0] * self.size for _ in range(self.size)]
+        for tile in range(1, self.size):
+            gi, gj = divmod(goal_cell[tile], self.n)
+            for cell in range(self.size):
+                i, j = divmod(cell, self.n)
+                self.distance[tile][cell] = abs(i - gi) + abs(j - gj)
+
+        self.neighbours = []
+        for cell in range(self.size):
+            i, j = divmod(cell, self.n)
+            cells = []
+            for di, dj in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+                if 0 <= i + di < self.n and 0 <= j + dj < self.n:
+                    cells.append((i + di) * self.n + j + dj)
+            self.neighbours.append(cells)
+
+    def blank(self, state):
+        for cell in range(self.size):
+            if not state >> 4 * cell & 15:
+                return cell
+        raise ValueError("The board has no blank tile")
+
+    def heuristic(self, state):
+        total = 0
+        for cell in range(self.size):
+            total += self.distance[state >> 4 * cell & 15][cell]
+        return total
+
+    def successors(self, state, blank, h):
+        # yields (child, new blank cell, child heuristic)
+        distance = self.distance
+        for cell in self.neighbours[blank]:
+            tile = state >> 4 * cell & 15
+            child = state - (tile << 4 * cell) + (tile << 4 * blank)
+            yield child, cell, h + distance[tile][blank] - distance[tile][cell]
+
+
+def pack(board):
+    n = len(board)
+    state = 0
+    for cell in range(n * n):
+        state |= board[cell // n][cell % n] << 4 * cell
+    return state
+
+
+def unpack(state, n=3):
+    return [[state >> 4 * (i * n + j) & 15 for j in range(n)] for i in range(n)]
+
+
+def is_solvable(board, goal=GOAL):
+    # count inversions of the tiles in the goal's order; a horizontal move
+    # keeps the count, a vertical one passes a tile over n - 1 others
+    n = len(board)
+    flat = [tile for row in board for tile in row]
+    goal_flat = [tile for row in goal for tile in row]
+    if sorted(flat) != sorted(goal_flat):
+        raise ValueError("The board and the goal hold different tiles")
+    goal_cell = {tile: cell for cell, tile in enumerate(goal_flat)}
+    order = [goal_cell[tile] for tile in flat if tile]
+    inversions = 0
+    for i in range(len(order)):
+        for j in range(i + 1, len(order)):
+            if order[i] > order[j]:
+                inversions += 1
+    if n % 2:
+        return inversions % 2 == 0
+    rows = abs(flat.index(0) // n - goal_flat.index(0) // n)
+    return (inversions + rows) % 2 == 0
+
+
+def print_board(board):
+    for row in board:
+        print(row)
+    print()
+
+
+def _path(parent, state, n):
+    path = []
+    while state is not None:
+        path.append(unpack(state, n))
+        state = parent[state]
+    return path[::-1]
+
+
+def astar(puzzle, start, verbose=False):
+    h = puzzle.heuristic(start)
+    best_g = {start: 0}
+    parent = {start: None}
+    queue = [(h, h, start, puzzle.blank(start))]
+    expanded = 0
+    max_frontier = 1
+
+    while queue:
+        f, h, state, blank = heapq.heappop(queue)
+        g = f - h
+        if g > best_g[state]:
+            continue
+        expanded += 1
+        if verbose:
+            print("Iteration: ", expanded)
+            print_board(unpack(state, puzzle.n))
+        if state == puzzle.goal:
+            return SearchResult(_path(parent, state, puzzle.n), expanded, max_frontier)
+
+        for child, cell, child_h in puzzle.successors(state, blank, h):
+            if g + 1 < best_g.get(child, g + 2):
+                best_g[child] = g + 1
+                parent[child] = state
+                heapq.heappush(queue, (g + 1 + child_h, child_h, child, cell))
+        max_frontier = max(max_frontier, len(queue))
+
+    return SearchResult(None, expanded, max_frontier)
+
+
+def bfs(puzzle, start, verbose=False):
+    parent = {start: None}
+    queue = collections.deque([(start, puzzle.blank(start), 0)])
+    expanded = 0
+    max_frontier = 1
+
+    while queue:
+        state, blank, level = queue.popleft()
+        expanded += 1
+        if verbose:
+            print("Level: ", level)
+            print_board(unpack(state, puzzle.n))
+        if state == puzzle.goal:
+            return SearchResult(_path(parent, state, puzzle.n), expanded, max_frontier)
+
+        for child, cell, _ in puzzle.successors(state, blank, 0):
+            if child not in parent:
+                parent[child] = state
+                queue.append((child, cell, level + 1))
+        max_frontier = max(max_frontier, len(queue))
+
+    return SearchResult(None, expanded, max_frontier)
+
+
+def iddfs(puzzle, start, max_depth=31, verbose=False):
+    # 31 moves is the diameter of the 8-puzzle
+    expanded = 0
+    # the frontier of a depth-first search is its path, one state per level
+    max_frontier = 1
+    path = [start]
+    on_path = {start}
+
+    def dfs(state, blank, depth):
+        nonlocal expanded, max_frontier
+        expanded += 1
+        max_frontier = max(max_frontier, len(path))
+        if verbose:
+            print("Level: ", len(path) - 1)
+            print_board(unpack(state, puzzle.n))
+        if state == puzzle.goal:
+            return True
+        if depth == 0:
+            return False
+        for child, cell, _ in puzzle.successors(state, blank, 0):
+            if child in on_path:
+                continue
+            path.append(child)
+            on_path.add(child)
+            if dfs(child, cell, depth - 1):
+                return True
+            path.pop()
+            on_path.remove(child)
+        return False
+
+    blank = puzzle.blank(start)
+    for limit in range(max_depth + 1):
+        if dfs(start, blank, limit):
+            boards = [unpack(state, puzzle.n) for state in path]
+            return SearchResult(boards, expanded, max_frontier)
+    return SearchResult(None, expanded, max_frontier)
+
+
+STRATEGIES = {"astar": astar, "bfs": bfs, "iddfs": iddfs}
+
+
+def solve(init, strategy="astar", goal=GOAL, verbose=False, **kwargs):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}")
+    if not is_solvable(init, goal):
+        return SearchResult(None, 0, 0)
+    puzzle = Puzzle(goal)
+    return STRATEGIES[strategy](puzzle, pack(init), verbose=verbose, **kwargs)
+
+
+if __name__ == "__main__":
+    init = [[2, 8, 3], [1, 6, 4], [7, 0, 5]]
+    for strategy in STRATEGIES:
+        result = solve(init, strategy)
+        print(
+            f"{strategy}: {len(result.path) - 1} moves, "
+            f"{result.expanded} nodes expanded, "
+            f"peak frontier {result.max_frontier}"
+        )
+    for board in solve(init).path:
+        print_board(board)
@@ -0,0 +1,129 @@
+import collections
+import functools
+import math
+import mmap
+import os
+import sys
+
+from eight_puzzle_search import (
+    GOAL,
+    Puzzle,
+    SearchResult,
+    is_solvable,
+    pack,
+    print_board,
+    unpack,
+)
+
+# exact distance to GOAL for every 3x3 board, one byte per Lehmer rank
+TABLE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "eight_puzzle_distances.bin"
+)
+UNREACHABLE = 0xFF
+SIZE = 9
+FACTORIALS = [math.factorial(i) for i in range(SIZE)]
+
+
+def rank(flat):
+    # Lehmer code: how many smaller tiles follow each tile, in factorial base
+    result = 0
+    for i in range(SIZE):
+        smaller = 0
+        for j in range(i + 1, SIZE):
+            if flat[j] < flat[i]:
+                smaller += 1
+        result += smaller * FACTORIALS[SIZE - 1 - i]
+    return result
+
+
+def unrank(index):
+    tiles = list(range(SIZE))
+    flat = []
+    for i in range(SIZE - 1, -1, -1):
+        digit, index = divmod(index, FACTORIALS[i])
+        flat.append(tiles.pop(digit))
+    return flat
+
+
+def state_rank(state):
+    return rank([state >> 4 * cell & 15 for cell in range(SIZE)])
+
+
+def build_table(path=TABLE_PATH):
+    # retrograde BFS: moves are reversible, so distance from the goal is
+    # distance to the goal
+    puzzle = Puzzle(GOAL)
+    table = bytearray([UNREACHABLE]) * math.factorial(SIZE)
+    table[state_rank(puzzle.goal)] = 0
+    queue = collections.deque([(puzzle.goal, puzzle.blank(puzzle.goal), 0)])
+    reached = 1
+    while queue:
+        state, blank, distance = queue.popleft()
+        for child, cell, _ in puzzle.successors(state, blank, 0):
+            index = state_rank(child)
+            if table[index] == UNREACHABLE:
+                table[index] = distance + 1
+                queue.append((child, cell, distance + 1))
+                reached += 1
+
+    with open(path + ".tmp", "wb") as f:
+        f.write(table)
+    os.replace(path + ".tmp", path)
+    return reached
+
+
+@functools.lru_cache(maxsize=None)
+def load_table(path=TABLE_PATH):
+    # built once on first use, memory-mapped afterwards
+    if not os.path.exists(path):
+        build_table(path)
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def distance(board):
+    if not is_solvable(board, GOAL):
+        return None
+    return load_table()[rank([tile for row in board for tile in row])]
+
+
+def solve(init):
+    """Walk down the table: some neighbour is always exactly one move closer.
+
+    The result's expanded counts table probes, the start's and one per
+    successor tried, and max_frontier is 0, as the walk keeps no frontier.
+    """
+    if not is_solvable(init, GOAL):
+        return SearchResult(None, 0, 0)
+    table = load_table()
+    puzzle = Puzzle(GOAL)
+    state = pack(init)
+    blank = puzzle.blank(state)
+    remaining = table[state_rank(state)]
+    probes = 1
+    path = [init]
+    while remaining:
+        for child, cell, _ in puzzle.successors(state, blank, 0):
+            probes += 1
+            if table[state_rank(child)] == remaining - 1:
+                state, blank = child, cell
+                remaining -= 1
+                break
+        path.append(unpack(state))
+    return SearchResult(path, probes, 0)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--build"]:
+        print(f"Stored {build_table()} reachable states in {TABLE_PATH}")
+        sys.exit(0)
+
+    init = [[2, 8, 3], [1, 6, 4], [7, 0, 5]]
+    result = solve(init)
+    print(f"Solved in {len(result.path) - 1} moves")
+    for board in result.path:
+        print_board(board)
+
+    # swapping two tiles flips the parity
+    unsolvable = [[8, 2, 3], [1, 6, 4], [7, 0, 5]]
+    print("Unsolvable board rejected:", solve(unsolvable).path is None)
@@ -0,0 +1,63 @@
+import argparse
+import random
+import statistics
+import time
+
+from eight_queens_problem_hill_climbing import min_conflicts, random_queens, solve
+
+SOLVERS = {
+    "annealing": lambda queens, seed: solve(queens, seed=seed),
+    "min-conflicts": lambda queens, seed: min_conflicts(queens, seed=seed),
+}
+
+
+def benchmark(sizes, seeds, solvers=SOLVERS):
+    """Time every solver on the same random boards for each N and seed.
+
+    Returns {(solver, n): [seconds or None]} with None for a failed run.
+    """
+    times = {}
+    for n in sizes:
+        for seed in range(seeds):
+            queens = random_queens(n, random.Random(seed))
+            for name, solver in solvers.items():
+                start = time.perf_counter()
+                solved = solver(list(queens), seed)
+                elapsed = time.perf_counter() - start
+                times.setdefault((name, n), []).append(
+                    elapsed if solved is not None else None
+                )
+    return times
+
+
+def quantile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(times):
+    print(
+        f"{'solver':<14}{'n':>8}{'solved':>9}{'min':>10}{'median':>10}"
+        f"{'p90':>10}{'max':>10}{'mean':>10}"
+    )
+    for (name, n), runs in sorted(times.items(), key=lambda item: item[0][1]):
+        solved = [run for run in runs if run is not None]
+        row = f"{name:<14}{n:>8}{len(solved):>5}/{len(runs):<3}"
+        if solved:
+            row += (
+                f"{min(solved):>10.4f}{statistics.median(solved):>10.4f}"
+                f"{quantile(solved, 0.9):>10.4f}{max(solved):>10.4f}"
+                f"{statistics.mean(solved):>10.4f}"
+            )
+        print(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 64, 512, 2048])
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--solvers", nargs="+", default=list(SOLVERS), choices=SOLVERS)
+    args = parser.parse_args()
+
+    solvers = {name: SOLVERS[name] for name in args.solvers}
+    report(benchmark(args.sizes, args.seeds, solvers))
@@ -1,86 +1,329 @@
+import concurrent.futures
 import math
+import multiprocessing
+import os
 import random
+import sys
+import time
+from typing import List, NamedTuple, Optional, Tuple
 
+import numpy as np
 
-def f(state):
-    attrack = 0
-    for i in range(len(state)):
-        quene = state[i]
-        being_attacked = False
-        for j in range(len(state)):
-            if i == j:
+
+class Board:
+    """N queens, one per column, with occupancy counters per line.
+
+    queens[col] is the row of the queen in that column. rows, diagonals
+    (row + col) and anti_diagonals (row - col + n - 1) count the queens on
+    each line, so the number of attacking pairs and the change made by a
+    move are O(1) to maintain.
+    """
+
+    def __init__(self, queens):
+        self.n = n = len(queens)
+        self.queens = list(queens)
+        self.rows = [0] * n
+        self.diagonals = [0] * (2 * n - 1)
+        self.anti_diagonals = [0] * (2 * n - 1)
+        for col, row in enumerate(self.queens):
+            self.rows[row] += 1
+            self.diagonals[row + col] += 1
+            self.anti_diagonals[row - col + n - 1] += 1
+        self.conflicts = sum(
+            count * (count - 1) // 2
+            for lines in (self.rows, self.diagonals, self.anti_diagonals)
+            for count in lines
+        )
+
+    def attacks(self, col):
+        # queens sharing a line with the queen in this column
+        row, n = self.queens[col], self.n
+        return (
+            self.rows[row]
+            + self.diagonals[row + col]
+            + self.anti_diagonals[row - col + n - 1]
+            - 3
+        )
+
+    def _remove(self, col):
+        row, n = self.queens[col], self.n
+        self.rows[row] -= 1
+        self.diagonals[row + col] -= 1
+        self.anti_diagonals[row - col + n - 1] -= 1
+        self.conflicts -= (
+            self.rows[row]
+            + self.diagonals[row + col]
+            + self.anti_diagonals[row - col + n - 1]
+        )
+
+    def _place(self, col, row):
+        n = self.n
+        self.conflicts += (
+            self.rows[row]
+            + self.diagonals[row + col]
+            + self.anti_diagonals[row - col + n - 1]
+        )
+        self.queens[col] = row
+        self.rows[row] += 1
+        self.diagonals[row + col] += 1
+        self.anti_diagonals[row - col + n - 1] += 1
+
+    def move(self, col, row):
+        # returns the change in attacking pairs
+        before = self.conflicts
+        self._remove(col)
+        self._place(col, row)
+        return self.conflicts - before
+
+    def swap(self, a, b):
+        # exchanging two rows keeps a permutation a permutation
+        before = self.conflicts
+        row_a, row_b = self.queens[a], self.queens[b]
+        self._remove(a)
+        self._remove(b)
+        self._place(a, row_b)
+        self._place(b, row_a)
+        return self.conflicts - before
+
+    def print(self):
+        for row in range(self.n):
+            print(
+                " ".join(
+                    "Q" if self.queens[col] == row else "*" for col in range(self.n)
+                )
+            )
+
+
+def random_queens(n, rng=random):
+    queens = list(range(n))
+    rng.shuffle(queens)
+    return queens
+
+
+def anneal(
+    board, max_iteration, alpha, temperature, rng, verbose=False, should_stop=None
+):
+    # returns the number of proposals made; the board is solved in place
+    n = board.n
+    check_every = max(n, 1024)
+    target_queen = 0
+    for iteration in range(max_iteration):
+        if board.conflicts == 0:
+            return iteration
+        if target_queen == 0:
+            if verbose:
+                print("Iteration:", iteration, "Conflicts:", board.conflicts)
+            temperature *= alpha
+        if should_stop is not None and iteration % check_every == 0 and should_stop():
+            return iteration
+
+        # a queen nobody attacks has nothing to gain from moving
+        if board.attacks(target_queen):
+            other = rng.randrange(n - 1)
+            if other >= target_queen:
+                other += 1
+            delta = board.swap(target_queen, other)
+            if delta > 0 and rng.random() >= math.exp(-delta / temperature):
+                board.swap(target_queen, other)
+
+        target_queen = (target_queen + 1) % n
+    return max_iteration
+
+
+def solve(
+    state, max_iteration=None, alpha=0.99, temperature=1.0, seed=None, verbose=False
+):
+    """Simulated annealing over row swaps.
+
+    state is either queens[col] = row or the original list of [row, col]
+    pairs, one queen per row and column. The temperature is multiplied by
+    alpha after every sweep of n proposals. Returns the solved queens list,
+    or None when the iteration budget runs out.
+    """
+    if state and isinstance(state[0], (list, tuple)):
+        queens = [0] * len(state)
+        for row, col in state:
+            queens[col] = row
+    else:
+        queens = state
+    if sorted(queens) != list(range(len(queens))):
+        raise ValueError("Swaps keep rows fixed, so the queens must be a permutation")
+    board = Board(queens)
+    if max_iteration is None:
+        max_iteration = 1000 * board.n
+    anneal(board, max_iteration, alpha, temperature, random.Random(seed), verbose)
+    return board.queens if board.conflicts == 0 else None
+
+
+def min_conflicts(state, max_steps=None, seed=None):
+    """Min-conflicts local search.
+
+    Each step picks a random attacked queen and moves it to the row of its
+    column with the fewest attackers, ties broken at random. Returns the
+    solved queens list, or None when the step budget runs out.
+    """
+    board = Board(state)
+    n = board.n
+    rng = random.Random(seed)
+    if max_steps is None:
+        max_steps = 100 * n
+    # NumPy copies of the line counters, so a column's costs are one
+    # vectorized sum of three slices; kept in step with the board on moves
+    rows = np.array(board.rows)
+    diagonals = np.array(board.diagonals)
+    anti_diagonals = np.array(board.anti_diagonals)
+
+    for _ in range(max_steps):
+        if board.conflicts == 0:
+            return board.queens
+        # rejection sampling is O(1) per try off the counters
+        col = rng.randrange(n)
+        while not board.attacks(col):
+            col = rng.randrange(n)
+
+        # attackers for every row of this column
+        row = board.queens[col]
+        costs = (
+            rows
+            + diagonals[col : col + n]
+            + anti_diagonals[n - 1 - col : 2 * n - 1 - col]
+        )
+        costs[row] -= 3
+        candidates = np.flatnonzero(costs == costs.min())
+        new_row = int(rng.choice(candidates))
+        board.move(col, new_row)
+        for line, old, new in (
+            (rows, row, new_row),
+            (diagonals, row + col, new_row + col),
+            (anti_diagonals, row - col + n - 1, new_row - col + n - 1),
+        ):
+            line[old] -= 1
+            line[new] += 1
+
+    return board.queens if board.conflicts == 0 else None
+
+
+# (alpha, temperature) pairs handed out to chains in turn
+SCHEDULES = [(0.99, 1.0), (0.995, 2.0), (0.98, 0.5), (0.999, 1.0)]
+
+
+class ParallelResult(NamedTuple):
+    queens: Optional[List[int]]
+    chain: Optional[int]  # index of the chain that solved the board
+    seed: Optional[int]
+    schedule: Optional[Tuple[float, float]]
+    iterations: int  # proposals made by all chains together
+    seconds: float
+    iterations_per_second: float
+
+
+_stop_event = None
+
+
+def _init_chain_worker(stop_event):
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _run_chain(n, seed, alpha, temperature, max_iteration):
+    rng = random.Random(seed)
+    board = Board(random_queens(n, rng))
+    iterations = anneal(
+        board, max_iteration, alpha, temperature, rng, should_stop=_stop_event.is_set
+    )
+    return (board.queens if board.conflicts == 0 else None), iterations
+
+
+def solve_parallel(
+    n, chains=None, workers=None, schedules=SCHEDULES, seed=0, max_iteration=None
+):
+    """Run independent annealing chains until the first one solves the board.
+
+    Chain i starts from its own random permutation with seed + i and
+    schedule i modulo the list. A shared event tells every running chain to
+    stop once one of them finishes with zero conflicts, and chains that have
+    not started are cancelled.
+    """
+    workers = workers or os.cpu_count() or 1
+    chains = chains or workers
+    if max_iteration is None:
+        max_iteration = 1000 * n
+
+    context = multiprocessing.get_context()
+    stop_event = context.Event()
+    start = time.perf_counter()
+    winner = None
+    iterations = 0
+    with concurrent.futures.ProcessPoolExecutor(
+        workers,
+        mp_context=context,
+        initializer=_init_chain_worker,
+        initargs=(stop_event,),
+    ) as pool:
+        futures = {}
+        for chain in range(chains):
+            alpha, temperature = schedules[chain % len(schedules)]
+            future = pool.submit(
+                _run_chain, n, seed + chain, alpha, temperature, max_iteration
+            )
+            futures[future] = chain
+
+        for future in concurrent.futures.as_completed(futures):
+            if future.cancelled():
                 continue
-            other_quene = state[j]
-            # check if the queen in the same row
-            if quene[0] == other_quene[0]:
-                being_attacked = True
-            # check if the queen in the same column
-            if quene[1] == other_quene[1]:
-                being_attacked = True
-            # check if the queen in the same diagonal
-            if abs(quene[0] - other_quene[0]) == abs(quene[1] - other_quene[1]):
-                being_attacked = True
-        if being_attacked:
-            attrack += 1
-    return 1 / math.exp(attrack)
-
-
-def solve(state, max_iteration=100000):
-    iternation = 0
-    target_quene = 0
-    alpha = 0.99
-    temperature = 1000
-    while True:
+            queens, chain_iterations = future.result()
+            iterations += chain_iterations
+            if queens is not None and winner is None:
+                winner = (futures[future], queens)
+                stop_event.set()
+                for other in futures:
+                    other.cancel()
+
+    seconds = time.perf_counter() - start
+    rate = iterations / seconds if seconds else 0.0
+    if winner is None:
+        return ParallelResult(None, None, None, None, iterations, seconds, rate)
+    chain, queens = winner
+    return ParallelResult(
+        queens,
+        chain,
+        seed + chain,
+        schedules[chain % len(schedules)],
+        iterations,
+        seconds,
+        rate,
+    )
+
+
+if __name__ == "__main__":
+    # usage: python eight_queens_problem_hill_climbing.py [N] [CHAINS]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    chains = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    if chains > 1:
+        result = solve_parallel(n, chains)
+        if result.queens is None:
+            print("Goal state not found!")
+            sys.exit(1)
         print(
-            "Iteration:",
-            iternation,
-            "Target quene:",
-            target_quene,
-            "Value:",
-            f(state),
-            end=" ",
+            f"Chain {result.chain} (seed {result.seed}, schedule {result.schedule}) "
+            f"won in {result.seconds:.2f}s, "
+            f"{result.iterations_per_second:.0f} iterations/s over all chains"
         )
+        if n <= 32:
+            Board(result.queens).print()
+        sys.exit(0)
 
-        # check if the state is the goal state
-        if f(state) > 0.99:
-            print("Goal state found!")
-            # print board
-            for i in range(8):
-                for j in range(8):
-                    if [i, j] in state:
-                        print("Q", end=" ")
-                    else:
-                        print("*", end=" ")
-                print()
-            return True
-        if iternation > max_iteration:
-            print("Goal state not found!")
-            return False
-
-        # find all possible next states
-        possible_next_states = [[i, target_quene] for i in range(8)]
-
-        # find value of possible next states
-        possible_next_states_values = [
-            f(state[:target_quene] + [pns] + state[target_quene + 1 :])
-            for pns in possible_next_states
-        ]
-
-        random_move = random.randint(0, len(possible_next_states_values) - 1)
-        delta = f(state) - possible_next_states_values[random_move]
-        if delta < 0:
-            state[target_quene] = possible_next_states[random_move]
-            print('rand', end=" ")
-        else:
-            if random.random() < math.exp(-delta/(temperature)):
-                state[target_quene] = possible_next_states[random_move]
-                print('rand', end=" ")
-        print()
-
-        iternation += 1
-        target_quene = (target_quene + 1) % 8
-        temperature *= alpha
+    if n == 8:
+        initial_state = [[0, 0], [1, 1], [2, 2], [3, 3], [4, 4], [5, 5], [6, 6], [7, 7]]
+    else:
+        initial_state = random_queens(n, random.Random(0))
 
-if __name__ == "__main__":
-    initial_state = [[0, 0], [1, 1], [2, 2], [3, 3], [4, 4], [5, 5], [6, 6], [7, 7]]
-    solve(initial_state)
+    start = time.perf_counter()
+    queens = solve(initial_state, seed=0, verbose=n <= 1000)
+    elapsed = time.perf_counter() - start
+    if queens is None:
+        print("Goal state not found!")
+    else:
+        print(f"Goal state found in {elapsed:.2f}s!")
+        if n <= 32:
+            Board(queens).print()
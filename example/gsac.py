@@ -1,79 +1,624 @@
+import collections
+import concurrent.futures
+import functools
+import itertools
+import os
+import struct
+import time
+from typing import List, NamedTuple, Optional
+
 import numpy as np
 
+# feature blocks are sized so one block of candidate masks stays near 32 MB
+BLOCK_WORDS = 1 << 22
 
-def gsac(dataset, name=[], target_name="target"):
-    # deal with exception
-    if len(dataset) == 0:
-        raise ValueError("The dataset should not be empty")
-    if len(dataset[0]) != len(name) + 1:
-        raise ValueError("The dataset and the name should have the same length")
+# set bits in each byte value, for NumPy releases without bitwise_count
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def pack_bits(mask):
+    """Pack a boolean array along its last axis into uint64 words.
+
+    Row r lands in word r // 64. The padding bits past the last row are zero,
+    so they never show up in a popcount.
+    """
+    packed = np.packbits(np.asarray(mask, dtype=bool), axis=-1, bitorder="little")
+    pad = -packed.shape[-1] % 8
+    if pad:
+        zeros = np.zeros(packed.shape[:-1] + (pad,), dtype=np.uint8)
+        packed = np.concatenate([packed, zeros], axis=-1)
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def pack_columns(X, chunk_rows=1 << 16):
+    """Pack each column of a 2-D 0/1 array into a row of uint64 words.
+
+    Works down the rows a chunk at a time, shifting eight rows into one byte
+    per column, which is several times faster than packbits along axis 0.
+    """
+    num_rows, num_columns = X.shape
+    chunk_rows -= chunk_rows % 8
+    packed = np.zeros((num_columns, -(-num_rows // 64) * 8), dtype=np.uint8)
+    for start in range(0, num_rows, chunk_rows):
+        bits = np.asarray(X[start : start + chunk_rows]) == 1
+        pad = -len(bits) % 8
+        if pad:
+            bits = np.concatenate([bits, np.zeros((pad, num_columns), dtype=bool)])
+        bits = bits.view(np.uint8).reshape(-1, 8, num_columns)
+        byte = bits[:, 0].copy()
+        for bit in range(1, 8):
+            byte |= bits[:, bit] << bit
+        packed[:, start // 8 : start // 8 + len(byte)] = byte.T
+    return packed.view(np.uint64)
+
+
+def append_bits(words, num_bits, new_words, num_new):
+    """Bitsets along the last axis with num_new bits appended after num_bits.
+
+    new_words holds the new bits from bit 0, as pack_bits packs them. They
+    are shifted into place, so the existing words are copied, not repacked.
+    """
+    start, offset = divmod(num_bits, 64)
+    num_words = -(-(num_bits + num_new) // 64)
+    out = np.zeros(words.shape[:-1] + (num_words + 1,), dtype=np.uint64)
+    out[..., : words.shape[-1]] = words
+    end = start + new_words.shape[-1]
+    if offset:
+        out[..., start:end] |= new_words << np.uint64(offset)
+        out[..., start + 1 : end + 1] |= new_words >> np.uint64(64 - offset)
+    else:
+        out[..., start:end] = new_words
+    return out[..., :num_words].copy()
+
+
+def popcount(words):
+    # set bits summed over the last axis
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    counts = _BYTE_POPCOUNT[words.view(np.uint8)]
+    return counts.sum(axis=-1, dtype=np.int64)
+
+
+class PackedDataset:
+    """Binary features stored column by column as packed bitsets.
+
+    features[f] holds one bit per row, set where feature f is 1, and
+    positives holds the rows whose target is 1. A rule's coverage is the AND
+    of its features' bitsets, and its counts are popcounts.
+    """
+
+    def __init__(self, X, y):
+        self.num_rows, self.num_features = X.shape
+        self.features = pack_columns(X)
+        self.positives = pack_bits(np.asarray(y) == 1)
+        # feature words ANDed into a mask, by coverage() and candidate_counts()
+        self.words_scanned = 0
+        self._reset_masks()
+
+    def _reset_masks(self):
+        # masks of the previous counts() call, extended rather than rebuilt
+        self._uncovered = ([], self.all_rows())
+        self._covered = (([], []), [], self._uncovered[1])
+
+    def all_rows(self):
+        return pack_bits(np.ones(self.num_rows, dtype=bool))
+
+    def append(self, X, y):
+        # the existing bitsets are shifted onto, never repacked
+        num_new = len(X)
+        self.features = append_bits(
+            self.features, self.num_rows, pack_columns(X), num_new
+        )
+        self.positives = append_bits(
+            self.positives, self.num_rows, pack_bits(np.asarray(y) == 1), num_new
+        )
+        self.num_rows += num_new
+        self._reset_masks()
+
+    def coverage(self, rule, mask):
+        # rows of mask that satisfy every feature in the rule
+        mask = mask.copy()
+        self.words_scanned += len(rule) * len(mask)
+        for feature in rule:
+            mask &= self.features[feature]
+        return mask
 
-    X = np.array(dataset)[:, :-1]
-    y = np.array(dataset)[:, -1]
-    # init r = {}
-    rules = []
+    def uncovered(self, rules, set_aside=()):
+        """Rows no rule covers, reusing the last result when rules only grew.
 
-    while len(X) > 0:
-        # init r_i = {}
-        selected_feature = [False for _ in range(X.shape[1])]
+        Positive rows covered by a rule in set_aside are left out as well.
+        """
+        rules = [list(rule) for rule in rules]
+        known, mask = self._uncovered
+        if rules[: len(known)] != known:
+            known, mask = [], self.all_rows()
+        for rule in rules[len(known) :]:
+            mask = mask & ~self.coverage(rule, mask)
+        self._uncovered = (rules, mask)
+        for rule in set_aside:
+            mask = mask & ~(self.coverage(rule, mask) & self.positives)
+        return mask
+
+    def candidate_counts(self, mask, candidates):
+        """Positive and total rows covered by mask AND each candidate feature.
+
+        Only words where mask has a bit set can contribute, so the scan
+        shrinks with the rule's coverage.
+        """
+        active = np.flatnonzero(mask)
+        mask, positives = mask[active], mask[active] & self.positives[active]
+        candidates = np.asarray(candidates, dtype=np.int64)
+        num_positive = np.zeros(len(candidates), dtype=np.int64)
+        num_covered = np.zeros(len(candidates), dtype=np.int64)
+        block = max(1, BLOCK_WORDS // max(1, len(active)))
+        self.words_scanned += len(candidates) * len(active)
+        for start in range(0, len(candidates), block):
+            bits = self.features[candidates[start : start + block]][:, active]
+            num_covered[start : start + block] = popcount(bits & mask)
+            num_positive[start : start + block] = popcount(bits & positives)
+        return num_positive, num_covered
+
+    def counts(self, rules, rule, candidates, set_aside=()):
+        """candidate_counts() for rule, on the rows no rule in rules covers.
+
+        Positive rows covered by a rule in set_aside are left out. A rule
+        grown by one feature since the last call costs a single AND.
+        """
+        rules = [list(known) for known in rules]
+        set_aside = [list(known) for known in set_aside]
+        known_rules, known_rule, mask = self._covered
+        if (
+            known_rules != (rules, set_aside)
+            or list(rule[: len(known_rule)]) != known_rule
+        ):
+            known_rule, mask = [], self.uncovered(rules, set_aside)
+        mask = self.coverage(rule[len(known_rule) :], mask)
+        self._covered = ((rules, set_aside), list(rule), mask)
+        return self.candidate_counts(mask, candidates)
+
+
+def chunk_counts(chunk, rules, rule, candidates, set_aside=()):
+    # the target is the chunk's last column, as in gsac()
+    chunk = np.asarray(chunk)
+    data = PackedDataset(chunk[:, :-1], chunk[:, -1])
+    return data.counts(rules, rule, candidates, set_aside)
+
+
+@functools.lru_cache(maxsize=None)
+def _open_npy(path):
+    return np.load(path, mmap_mode="r")
+
+
+def _npy_chunk_counts(path, start, stop, rules, rule, candidates, set_aside=()):
+    # process pool task: each worker maps the file once and slices its rows
+    chunk = _open_npy(path)[start:stop]
+    return chunk_counts(chunk, rules, rule, candidates, set_aside)
+
+
+class ChunkedDataset:
+    """A dataset streamed in row chunks for data larger than memory.
+
+    source is a path to a .npy file, opened memory-mapped, a 2-D array whose
+    row slices are read on demand, or a callable returning a fresh iterable
+    of 2-D row chunks. The target is the last column. Every refinement step
+    is one pass in which each chunk is packed, counted and dropped, so memory
+    depends on chunk_rows and workers, never on the number of rows.
+
+    Chunks are counted on a thread pool; NumPy drops the GIL for the packing
+    and bitwise work. With processes=True a .npy source is counted on a
+    process pool instead, each worker mapping the file itself.
+    """
+
+    def __init__(self, source, chunk_rows=1 << 18, workers=None, processes=False):
+        self.path = None
+        if isinstance(source, (str, os.PathLike)):
+            self.path = os.fspath(source)
+            source = np.load(self.path, mmap_mode="r")
+        if processes and self.path is None:
+            raise ValueError("A process pool needs the dataset as a .npy path")
+        self.source = source
+        self.chunk_rows = chunk_rows
+        self.workers = workers or os.cpu_count() or 1
+        self.processes = processes
+        self.pool = None
+
+        if hasattr(source, "shape"):
+            self.num_rows, num_columns = source.shape
+            empty = self.num_rows == 0
+        else:
+            # rows are only known after a full pass
+            first = next(iter(source()), None)
+            self.num_rows = None
+            empty = first is None or len(first) == 0
+            num_columns = 0 if empty else np.shape(first)[1]
+        if empty:
+            raise ValueError("The dataset should not be empty")
+        self.num_features = num_columns - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def tasks(self):
+        # (function, chunk arguments...) per chunk, in row order
+        if self.processes:
+            for start in range(0, self.num_rows, self.chunk_rows):
+                stop = start + self.chunk_rows
+                yield _npy_chunk_counts, self.path, start, stop
+        elif hasattr(self.source, "shape"):
+            for start in range(0, self.num_rows, self.chunk_rows):
+                yield chunk_counts, self.source[start : start + self.chunk_rows]
+        else:
+            for chunk in self.source():
+                yield chunk_counts, chunk
+
+    def counts(self, rules, rule, candidates, set_aside=()):
+        num_positive = np.zeros(len(candidates), dtype=np.int64)
+        num_covered = np.zeros(len(candidates), dtype=np.int64)
+        if self.pool is None:
+            if self.processes:
+                executor = concurrent.futures.ProcessPoolExecutor
+            else:
+                executor = concurrent.futures.ThreadPoolExecutor
+            self.pool = executor(self.workers)
+
+        # a few chunks per worker in flight, so reading never runs ahead
+        pending = collections.deque()
+        tasks = self.tasks()
         while True:
-            best_feature = None
-            best_r = 0
-            # loop through all features to find the best feature
-            for feature in range(X.shape[1]):
-                # exclude the feature that has been selected
-                if selected_feature[feature]:
-                    continue
+            for function, *args in itertools.islice(
+                tasks, 2 * self.workers - len(pending)
+            ):
+                pending.append(
+                    self.pool.submit(
+                        function, *args, rules, rule, candidates, set_aside
+                    )
+                )
+            if not pending:
+                return num_positive, num_covered
+            positive, covered = pending.popleft().result()
+            num_positive += positive
+            num_covered += covered
+
+
+def grow(data, rules, rule=(), set_aside=()):
+    # (rule, pure): rule as grown by refine(), pure once it covers positives
+    # only; an impure rule is where no feature covered a positive row any more
+    rule = list(rule)
+    selected = np.zeros(data.num_features, dtype=bool)
+    selected[rule] = True
+    while True:
+        candidates = np.flatnonzero(~selected)
+        num_positive, num_covered = data.counts(rules, rule, candidates, set_aside)
+        # candidates covering no positive row are never picked
+        precision = np.where(
+            num_positive > 0, num_positive / np.maximum(num_covered, 1), -1.0
+        )
+        if not len(candidates) or precision.max() < 0:
+            return sorted(rule), False
+        best = int(np.argmax(precision))
+        selected[candidates[best]] = True
+        rule.append(int(candidates[best]))
+        if num_positive[best] == num_covered[best]:
+            return sorted(rule), True
+
+
+def refine(data, rules, rule=()):
+    """Grow rule one feature at a time until it covers positives only.
+
+    Works on the rows no rule in rules covers, always adding the feature
+    with the highest precision among those that still cover a positive row.
+    Returns the rule as a sorted list of feature indices, or None when no
+    feature does.
+    """
+    rule, pure = grow(data, rules, rule)
+    return rule if pure else None
+
+
+def learn_rules(data, rules=()):
+    """Greedy sequential covering over a PackedDataset or ChunkedDataset.
+
+    Each rule starts empty and is refined until it covers positives only.
+    Its rows are then removed and the next rule starts, until no positive
+    row is left. When refinement runs into a dead end, the positive rows the
+    unfinished rule covers are set aside and covering goes on with the
+    rest, so only those and rows with no feature at all stay uncovered.
+    Learning continues after any rules given. Returns each rule as a sorted
+    list of feature indices.
+    """
+    rules = [list(rule) for rule in rules]
+    set_aside = []
+    while True:
+        rule, pure = grow(data, rules, (), set_aside)
+        if pure:
+            rules.append(rule)
+        elif rule:
+            # every feature of it covered a positive, so this drops at least one
+            set_aside.append(rule)
+        else:
+            return rules
+
+
+class RuleSet:
+    """Learned rules compiled for batch scoring.
 
-                # create a new rule with the selected feature
-                temp_selected_feature = selected_feature.copy()
-                temp_selected_feature[feature] = True
+    columns lists the features any rule uses and masks[r, j] is set when
+    rule r requires feature columns[j]. A row fires rule r when it has every
+    required feature, and is predicted positive when any rule fires. Rows
+    are gathered down to the used columns and packed into uint64 words like
+    the masks, so checking a rule is one AND and compare per word.
+    """
 
-                # if the rule is not able to cover any positive sample, skip
-                if (
-                    sum(y[np.all(X[:, temp_selected_feature] == 1, axis=1)])
-                    == 0
-                ):
+    MAGIC = b"GSAC"
+    VERSION = 1
+    # magic, version, rules, features, used columns
+    HEADER = struct.Struct("<4sBIII")
+
+    def __init__(self, rules, num_features, name=None, target_name="target"):
+        self.rules = [sorted(int(feature) for feature in rule) for rule in rules]
+        self.num_features = num_features
+        self.name = list(name) if name else [str(i) for i in range(num_features)]
+        self.target_name = target_name
+        self.columns = np.unique(
+            np.array([f for rule in self.rules for f in rule], dtype=np.uint32)
+        )
+        self.masks = np.zeros((len(self.rules), len(self.columns)), dtype=bool)
+        for index, rule in enumerate(self.rules):
+            self.masks[index, np.searchsorted(self.columns, rule)] = True
+        self.packed_masks = pack_bits(self.masks)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __str__(self):
+        return "\n".join(
+            " AND ".join(self.name[i] for i in rule) + " => " + self.target_name
+            for rule in self.rules
+        )
+
+    def _fired_chunks(self, X, chunk_rows):
+        if np.shape(X)[1] != self.num_features:
+            raise ValueError(f"Expected {self.num_features} feature columns")
+        masks = self.packed_masks
+        for start in range(0, len(X), chunk_rows):
+            chunk = np.asarray(X[start : start + chunk_rows])
+            rows = pack_bits(chunk[:, self.columns] == 1)
+            yield start, ((rows[:, None, :] & masks) == masks).all(axis=2)
+
+    def fires(self, X, chunk_rows=1 << 16):
+        # (rows, rules) matrix of which rules each row fires
+        fired = np.empty((len(X), len(self.rules)), dtype=bool)
+        for start, chunk in self._fired_chunks(X, chunk_rows):
+            fired[start : start + len(chunk)] = chunk
+        return fired
+
+    def predict(self, X, return_counts=False, chunk_rows=1 << 16):
+        """1 where any rule fires, 0 elsewhere.
+
+        X is a 2-D array of feature columns, a memmap included, scored a
+        chunk of rows at a time. With return_counts, also returns how many
+        rows fired each rule.
+        """
+        predictions = np.empty(len(X), dtype=np.uint8)
+        counts = np.zeros(len(self.rules), dtype=np.int64)
+        for start, chunk in self._fired_chunks(X, chunk_rows):
+            predictions[start : start + len(chunk)] = chunk.any(axis=1)
+            if return_counts:
+                counts += chunk.sum(axis=0)
+        return (predictions, counts) if return_counts else predictions
+
+    def to_bytes(self):
+        names = "\n".join(self.name + [self.target_name]).encode()
+        return b"".join(
+            [
+                self.HEADER.pack(
+                    self.MAGIC,
+                    self.VERSION,
+                    len(self.rules),
+                    self.num_features,
+                    len(self.columns),
+                ),
+                self.columns.astype("<u4").tobytes(),
+                self.packed_masks.astype("<u8").tobytes(),
+                struct.pack("<I", len(names)),
+                names,
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        header = cls.HEADER.unpack_from(data)
+        magic, version, num_rules, num_features, num_columns = header
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("Not a gsac rule set")
+        offset = cls.HEADER.size
+        columns = np.frombuffer(data, "<u4", num_columns, offset)
+        offset += columns.nbytes
+        num_words = -(-num_columns // 64)
+        packed = np.frombuffer(data, "<u8", num_rules * num_words, offset)
+        offset += packed.nbytes
+        (length,) = struct.unpack_from("<I", data, offset)
+        names = bytes(data[offset + 4 : offset + 4 + length]).decode().split("\n")
+        masks = np.unpackbits(
+            packed.reshape(num_rules, num_words).view(np.uint8),
+            axis=1,
+            count=num_columns,
+            bitorder="little",
+        ).astype(bool)
+        rules = [columns[mask].tolist() for mask in masks]
+        return cls(rules, num_features, names[:-1], names[-1])
+
+    def save(self, path):
+        with open(path + ".tmp", "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class UpdateReport(NamedTuple):
+    rows_added: int
+    broken_rules: List[int]  # indices, before the update, of rules repaired
+    dropped_rules: int  # broken rules that could not be repaired
+    new_rules: int
+    words_scanned: int  # feature words the update ANDed, coverage included
+    retrain_words_scanned: int  # a full retrain on every row, for comparison
+    seconds: float
+    retrain_seconds: Optional[float]  # measured only when asked for
+
+
+class IncrementalLearner:
+    """gsac rules kept current while labelled rows are appended.
+
+    Each rule's positive and covered row counts are kept. Appended rows are
+    only checked against the existing rules: a rule that now covers a
+    negative row is refined further, and new rules are learned for positive
+    rows no rule covers. Rules the new rows leave pure are not touched,
+    because a pure rule stays pure when the rules before it change.
+    """
+
+    def __init__(self, dataset, name=None, target_name="target"):
+        if len(dataset) == 0:
+            raise ValueError("The dataset should not be empty")
+        dataset = np.asarray(dataset)
+        self.name = name
+        self.target_name = target_name
+        self.data = PackedDataset(dataset[:, :-1], dataset[:, -1])
+        start = time.perf_counter()
+        self.rules = learn_rules(self.data)
+        self.fit_seconds = time.perf_counter() - start
+        self.fit_words_scanned = self.data.words_scanned
+        self.fit_rows = self.data.num_rows
+        self.num_positive, self.num_covered = self.rule_counts(self.data)
+        self.num_stranded = self.uncovered_positives()
+
+    def uncovered_positives(self):
+        # positive rows no conjunction could separate when rules were learned
+        return int(popcount(self.data.uncovered(self.rules) & self.data.positives))
+
+    def rule_counts(self, data):
+        # positive and total rows each rule covers, regardless of rule order
+        everything = data.all_rows()
+        num_positive = np.zeros(len(self.rules), dtype=np.int64)
+        num_covered = np.zeros(len(self.rules), dtype=np.int64)
+        for index, rule in enumerate(self.rules):
+            mask = data.coverage(rule, everything)
+            num_covered[index] = popcount(mask)
+            num_positive[index] = popcount(mask & data.positives)
+        return num_positive, num_covered
+
+    def rule_set(self):
+        return RuleSet(self.rules, self.data.num_features, self.name, self.target_name)
+
+    def append(self, rows, compare=False):
+        """Fold new labelled rows into the rules and report the work done.
+
+        The cost of a full retrain is estimated from the last full fit,
+        scaled by the number of rows, unless compare is set, in which case
+        it is measured by actually retraining.
+        """
+        rows = np.asarray(rows)
+        start = time.perf_counter()
+        scanned = self.data.words_scanned
+        new = PackedDataset(rows[:, :-1], rows[:, -1])
+        new_positive, new_covered = self.rule_counts(new)
+        self.num_positive += new_positive
+        self.num_covered += new_covered
+        broken = np.flatnonzero(new_covered > new_positive).tolist()
+
+        self.data.append(rows[:, :-1], rows[:, -1])
+        rules, dropped = [], 0
+        for index, rule in enumerate(self.rules):
+            if index in broken:
+                rule = refine(self.data, rules, rule)
+                if rule is None:
+                    dropped += 1
                     continue
-                # calculate the r value of the rule, r = number of positive sample under the rule / number of sample under the rule
-                r = y[
-                    np.all(X[:, temp_selected_feature] == 1, axis=1)
-                ].sum() / len(
-                    y[np.all(X[:, temp_selected_feature] == 1, axis=1)]
-                )
-                # update the best feature
-                if r > best_r:
-                    best_r = r
-                    best_feature = feature
-
-            # add the best feature to the selected feature
-            selected_feature[best_feature] = True
-
-            # if the rule is able to cover all positive samples, break
-            selected_only_positive = y[
-                np.all(X[:, selected_feature] == 1, axis=1)
-            ].sum() == len(y[np.all(X[:, selected_feature] == 1, axis=1)])
-            if selected_only_positive:
-                break
-
-        # add the rule to the rules
-        rules.append(selected_feature)
-        # remove the samples that are covered by the rule
-        X, y = (
-            X[~np.all(X[:, selected_feature] == 1, axis=1)],
-            y[~np.all(X[:, selected_feature] == 1, axis=1)],
+            rules.append(rule)
+        num_kept = len(rules)
+        self.rules = rules
+        # a full candidate scan is only worth it for newly uncovered positives
+        if self.uncovered_positives() > self.num_stranded:
+            self.rules = learn_rules(self.data, rules)
+            self.num_stranded = self.uncovered_positives()
+        if broken or len(self.rules) > num_kept:
+            self.num_positive, self.num_covered = self.rule_counts(self.data)
+        seconds = time.perf_counter() - start
+        # the appended rows were first counted as a dataset of their own
+        words_scanned = self.data.words_scanned - scanned + new.words_scanned
+
+        retrain_seconds = None
+        if compare:
+            scanned = self.data.words_scanned
+            start = time.perf_counter()
+            learn_rules(self.data)
+            retrain_seconds = time.perf_counter() - start
+            retrain_words = self.data.words_scanned - scanned
+        else:
+            retrain_words = round(
+                self.fit_words_scanned * self.data.num_rows / self.fit_rows
+            )
+        return UpdateReport(
+            len(rows),
+            broken,
+            dropped,
+            len(self.rules) - num_kept,
+            words_scanned,
+            retrain_words,
+            seconds,
+            retrain_seconds,
         )
 
-        # if there is no positive sample left, break
-        if sum(y) == 0:
-            break
 
-    for rule in rules:
-        output = []
-        for i in range(len(rule)):
-            if rule[i]:
-                output.append(name[i] if name else str(i))
-        print(" AND ".join(output) + " => " + target_name)
+def gsac(dataset, name=[], target_name="target", chunk_rows=None, workers=None):
+    """Learn rules for the last column of dataset, print them, return a RuleSet.
+
+    dataset is a list of rows or an array, held in memory as packed bitsets,
+    or any source ChunkedDataset takes, which is then streamed. Lists and
+    arrays are streamed too when chunk_rows or workers is given.
+    """
+    if isinstance(dataset, (list, tuple)):
+        if len(dataset) == 0:
+            raise ValueError("The dataset should not be empty")
+        # rows given as lists become one array, whether streamed or not
+        dataset = np.asarray(dataset)
+    streamed = (
+        isinstance(dataset, (str, os.PathLike, np.memmap))
+        or callable(dataset)
+        or chunk_rows is not None
+        or workers is not None
+    )
+    if streamed:
+        data = ChunkedDataset(dataset, chunk_rows or 1 << 18, workers)
+    else:
+        # deal with exception
+        if len(dataset) == 0:
+            raise ValueError("The dataset should not be empty")
+        dataset = np.asarray(dataset)
+        data = PackedDataset(dataset[:, :-1], dataset[:, -1])
+    if data.num_features != len(name):
+        raise ValueError("The dataset and the name should have the same length")
+
+    try:
+        rules = learn_rules(data)
+    finally:
+        if streamed:
+            data.close()
+
+    rule_set = RuleSet(rules, data.num_features, name, target_name)
+    if rules:
+        print(rule_set)
+    return rule_set
 
 
 if __name__ == '__main__':
@@ -88,7 +633,11 @@ if __name__ == '__main__':
         [1, 0, 1, 0, 0],
         [1, 1, 0, 0, 0],
     ]
-    gsac(example1, ["APP", "RATING", "INC", "BAL"], "OK")
+    rule_set = gsac(example1, ["APP", "RATING", "INC", "BAL"], "OK")
+    predictions, counts = rule_set.predict(
+        np.array(example1)[:, :-1], return_counts=True
+    )
+    print("Predicted:", predictions, "rows per rule:", counts)
 
     example2 = [
         [1, 0, 1, 0, 1, 1, 1],
@@ -104,3 +653,16 @@ if __name__ == '__main__':
         [0, 0, 0, 1, 1, 0, 0],
     ]
     gsac(example2, ["GPA", "UST", "HKU", "CU", "REC", "EXP"], "Hire")
+
+    # learned from the first rows, then updated with the rest; repairs start
+    # from the early rules, so they can differ from the full fit above
+    learner = IncrementalLearner(
+        example2[:6], ["GPA", "UST", "HKU", "CU", "REC", "EXP"], "Hire"
+    )
+    report = learner.append(example2[6:])
+    print(learner.rule_set())
+    print(
+        f"Repaired rules {report.broken_rules}, {report.new_rules} new, "
+        f"{report.words_scanned} words scanned "
+        f"(about {report.retrain_words_scanned} to retrain)"
+    )
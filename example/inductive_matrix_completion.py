@@ -1,10 +1,13 @@
 import numpy as np
-import pandas as pd
 import torch
 import torch.nn as nn
 import torch.optim as optim
 from sklearn.model_selection import train_test_split
 
+import matrix_completion_als
+import matrix_completion_data
+import matrix_completion_topk
+
 # Generate synthetic data for user and item features
 # User features (e.g., age, income)
 user_features = np.array([[25, 30000],
@@ -27,77 +30,169 @@ ratings = np.array([[5, np.nan, 3, 4, np.nan],
                     [1, np.nan, 4, 3, np.nan],
                     [2, 1, np.nan, np.nan, 4]])
 
-# Create a DataFrame to handle missing values easily
-df = pd.DataFrame(columns=['user_id', 'rating'])
-for i in range(len(ratings)):
-    df.loc[i] = [i, ratings[i]]
-print(df)
-
-# Merge user and item features with ratings
-df['user_feature'] = df['user_id'].apply(lambda x: user_features[x])
-df['item_feature'] = df['item_id'].apply(lambda x: item_features[x])
-df['combined_features'] = df.apply(lambda x: np.concatenate([x['user_feature'], x['item_feature']]), axis=1)
 
-# Prepare features and labels (only use non-missing ratings)
-df = df.dropna()
-X = np.array(list(df['combined_features']))
-y = df['rating'].values
+# Define the neural network model
+class MatrixCompletionModel(nn.Module):
+    """Predicts 5 * sigmoid(u^T M v) for user features u and item features v.
 
-# Convert data to PyTorch tensors
-X_tensor = torch.tensor(X, dtype=torch.float32)
-y_tensor = torch.tensor(y, dtype=torch.float32)
+    forward() takes a batch of B observed pairs as two aligned feature
+    arrays and scores each pair on its own, so a batch costs O(B) rather
+    than the O(B^2) of scoring every user in it against every item.
 
-# Split the dataset into train and test sets
-X_train, X_test, y_train, y_test = train_test_split(X_tensor, y_tensor, test_size=0.2, random_state=42)
+    With a rank, M = W H^T is learned through its factors and never formed:
+    users and items are projected to rank dimensions first, so a pair costs
+    rank * (d_u + d_i) instead of d_u * d_i, and so do the parameters.
+    """
 
-# Define the neural network model
-class MatrixCompletionModel(nn.Module):
-    def __init__(self, user_features_size, item_features_size):
+    def __init__(self, user_features_size, item_features_size, rank=None):
         super(MatrixCompletionModel, self).__init__()
         self.user_features_size = user_features_size
-        self.M = nn.Parameter(torch.rand((user_features_size, item_features_size)))  # Learnable matrix M
-
-    def forward(self, x):
-        user_features = x[:, :self.user_features_size]
-        item_features = x[:, self.user_features_size:]
-        y = torch.matmul(user_features, self.M)  # Multiply user features with M
-        y = torch.matmul(y, item_features.T)  # Then dot product with item features
+        self.rank = rank
+        if rank is None:
+            # Learnable matrix M
+            self.M = nn.Parameter(torch.rand((user_features_size, item_features_size)))
+        else:
+            # scaled so the entries of W H^T start out near those of M
+            self.W = nn.Parameter(torch.rand((user_features_size, rank)) / rank**0.5)
+            self.H = nn.Parameter(torch.rand((item_features_size, rank)) / rank**0.5)
+
+    def forward(self, user_features, item_features):
+        if self.rank is None:
+            # (B, d_u) x (d_u, d_i) x (B, d_i) -> (B), contracted left to right
+            y = torch.einsum("bu,ui,bi->b", user_features, self.M, item_features)
+        else:
+            # (B, d_u) x (d_u, r) and (B, d_i) x (d_i, r), then a row-wise dot
+            y = torch.einsum(
+                "br,br->b", user_features @ self.W, item_features @ self.H
+            )
 
         y = torch.sigmoid(y) * 5
         return y
 
-# Initialize the model, loss function, and optimizer
-model = MatrixCompletionModel(df['user_feature'][0].shape[0], df['item_feature'][0].shape[0])
-criterion = nn.MSELoss()  # Mean Squared Error Loss
-optimizer = optim.Adam(model.parameters(), lr=0.01)
-
-# Train the model
-num_epochs = 1000
-for epoch in range(num_epochs):
-    model.train()
-    optimizer.zero_grad()  # Clear gradients
-
-    # Forward pass
-    predictions = model(X_train)
-
-    # Calculate loss
-    loss = criterion(predictions.squeeze(), y_train)
-
-    # Backward pass and optimization
-    loss.backward()
-    optimizer.step()
-
-    # Print loss every 100 epochs
-    if (epoch + 1) % 100 == 0:
-        print(f'Epoch [{epoch + 1}/{num_epochs}], Loss: {loss.item():.4f}')
-
-# Evaluate the model on the test set
-model.eval()
-with torch.no_grad():
-    test_predictions = model(X_test).squeeze()
-    test_loss = criterion(test_predictions, y_test)
-    print(f'Test Loss: {test_loss.item():.4f}')
-    for i in range(len(test_predictions)):
-      print(X_test[i])
-      print(test_predictions[i])
-
+    def interaction(self):
+        # M, or its factors (W, H), as NumPy arrays for matrix_completion_topk
+        if self.rank is None:
+            return self.M.detach().numpy()
+        return self.W.detach().numpy(), self.H.detach().numpy()
+
+    def set_interaction(self, M):
+        # copy in M, or (W, H), e.g. from matrix_completion_als.fit
+        with torch.no_grad():
+            if self.rank is None:
+                self.M.copy_(torch.as_tensor(M))
+            else:
+                self.W.copy_(torch.as_tensor(M[0]))
+                self.H.copy_(torch.as_tensor(M[1]))
+        return self
+
+
+def pair_batches(tensors, batch_size, shuffle=True, generator=None):
+    """Yield aligned mini-batches of observed pairs, in a new order per call.
+
+    Each batch is one gather per tensor from a single permutation, which
+    keeps the per-batch overhead flat where a DataLoader would index and
+    collate pair by pair.
+    """
+    num_pairs = len(tensors[0])
+    if shuffle:
+        order = torch.randperm(num_pairs, generator=generator)
+    else:
+        order = torch.arange(num_pairs)
+    for batch in order.split(batch_size):
+        yield tuple(tensor[batch] for tensor in tensors)
+
+
+def train(
+    model,
+    user_x,
+    item_x,
+    y,
+    num_epochs=10,
+    batch_size=4096,
+    lr=0.01,
+    log_every=1,
+    generator=None,
+):
+    criterion = nn.MSELoss()  # Mean Squared Error Loss
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+    for epoch in range(num_epochs):
+        model.train()
+        total_loss = 0.0
+        for user_batch, item_batch, y_batch in pair_batches(
+            (user_x, item_x, y), batch_size, generator=generator
+        ):
+            optimizer.zero_grad()  # Clear gradients
+            loss = criterion(model(user_batch, item_batch), y_batch)
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(y_batch)
+
+        if log_every and (epoch + 1) % log_every == 0:
+            print(
+                f"Epoch [{epoch + 1}/{num_epochs}], Loss: {total_loss / len(y):.4f}"
+            )
+    return model
+
+
+if __name__ == "__main__":
+    # standardized, so the sigmoid does not saturate on raw incomes and prices
+    user_x = (user_features - user_features.mean(0)) / user_features.std(0)
+    item_x = (item_features - item_features.mean(0)) / item_features.std(0)
+
+    # Prepare features and labels (only use non-missing ratings)
+    observed = matrix_completion_data.from_dense(ratings)
+    user_pairs, item_pairs = matrix_completion_data.gather_features(
+        user_x, item_x, observed
+    )
+    # from_numpy shares the float32 buffers instead of copying them
+    user_tensor = torch.from_numpy(user_pairs)
+    item_tensor = torch.from_numpy(item_pairs)
+    y_tensor = torch.from_numpy(observed.values)
+
+    # Split the pair indices into train and test sets, so the training
+    # ratings stay available as triplets for the least squares start
+    train_pairs, test_pairs = train_test_split(
+        np.arange(len(observed.values)), test_size=0.2, random_state=42
+    )
+    user_train, user_test = user_tensor[train_pairs], user_tensor[test_pairs]
+    item_train, item_test = item_tensor[train_pairs], item_tensor[test_pairs]
+    y_train, y_test = y_tensor[train_pairs], y_tensor[test_pairs]
+
+    # Initialize the model from the least squares solution on the training
+    # pairs, then fine-tune it on the rating loss itself
+    train_ratings = matrix_completion_data.Ratings(
+        *(column[train_pairs] for column in observed)
+    )
+    model = MatrixCompletionModel(user_x.shape[1], item_x.shape[1])
+    model.set_interaction(
+        matrix_completion_als.fit(user_x, item_x, train_ratings, verbose=True)
+    )
+    train(
+        model,
+        user_train,
+        item_train,
+        y_train,
+        num_epochs=200,
+        batch_size=4,
+        log_every=20,
+        generator=torch.Generator().manual_seed(0),
+    )
+
+    # Evaluate the model on the test set
+    model.eval()
+    with torch.no_grad():
+        test_predictions = model(user_test, item_test)
+        test_loss = nn.MSELoss()(test_predictions, y_test)
+        print(f"Test Loss: {test_loss.item():.4f}")
+        for i in range(len(test_predictions)):
+            print(user_test[i], item_test[i])
+            print(test_predictions[i])
+
+    # Top 2 items for every user
+    recommendations = matrix_completion_topk.recommend(
+        user_x, item_x, model.interaction(), k=2
+    )
+    for user, (items, scores) in enumerate(
+        zip(recommendations.items, recommendations.ratings)
+    ):
+        print(f"User {user}: items {items.tolist()}, predicted {scores.round(2)}")
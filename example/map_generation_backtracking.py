@@ -1,7 +1,12 @@
+import argparse
 import enum
-from typing import Dict, List
+import random
+import time
+from typing import Dict, List, NamedTuple
+
 import numpy as np
 
+
 class BlockType(enum.IntEnum):
     EMPTY = 0
     BLOCK1 = 1
@@ -57,104 +62,186 @@ block_type_to_string = {
     BlockType.BLOCK11: ['###', '#  ', '# #'],
 }
 
-direction_to_coordinate_change = {
-    Direction.NORTH: (-1, 0),
-    Direction.EAST: (0, 1),
-    Direction.SOUTH: (1, 0),
-    Direction.WEST: (0, -1),
-}
-
 choosalbe_blocks = list(filter(lambda x: x != BlockType.EMPTY, BlockType))
 
 
-def generate_map(
-    width, height
-) -> np.ndarray[BlockType, np.dtype[np.int8]] | None:
-    x, y = np.random.randint(0, height), np.random.randint(0, width)
-    map = np.full((height, width), BlockType.EMPTY)
-    if assign_block(map, x, y, np.random.choice(choosalbe_blocks)):
-        return map
+# bit b of a domain is set while BlockType b is still possible for the cell
+FULL_DOMAIN = sum(1 << block for block in choosalbe_blocks)
+DOMAINS = 1 << len(BlockType)
+domain_blocks = [
+    tuple(block for block in BlockType if domain >> block & 1)
+    for domain in range(DOMAINS)
+]
+domain_size = [len(blocks) for blocks in domain_blocks]
+
+# compatible[direction][block]: blocks allowed next to block on that side,
+# those with an opening facing back exactly when block opens that way
+compatible = [[0] * len(BlockType) for _ in Direction]
+for direction in Direction:
+    opposite = Direction((direction + 2) % 4)
+    for block in choosalbe_blocks:
+        compatible[direction][block] = sum(
+            1 << other
+            for other in choosalbe_blocks
+            if (direction in rules[block]) == (opposite in rules[other])
+        )
+
+# support[direction][domain]: union of compatible over the blocks of a domain,
+# so one lookup narrows a neighbour however many blocks are left
+support = [[0] * DOMAINS for _ in Direction]
+for direction in Direction:
+    for domain in range(1, DOMAINS):
+        lowest = domain & -domain
+        support[direction][domain] = (
+            support[direction][domain ^ lowest]
+            | compatible[direction][lowest.bit_length() - 1]
+        )
+
+
+class Solution(NamedTuple):
+    tiles: np.ndarray | None  # (height, width) int8 BlockType values
+    decisions: int
+    backtracks: int
+    seconds: float
 
-    print('Failed to generate map')
-    return None
 
+def solve_tiles(height, width, rng=None, domains=None) -> Solution:
+    """Fill a height x width grid so every pair of neighbours agrees.
 
-def assign_block(map, x, y, block):
-    map[x][y] = block
-
-    is_conflict = False
-    for direction, neighbour in get_neighbour(map, x, y).items():
-        if neighbour is None:
-            continue
-        if neighbour == BlockType.EMPTY:
-            continue
-        relative_direction = (direction.value + 2) % 4
-        if (
-            direction in rules[block]
-            and Direction(relative_direction) not in rules[neighbour]
-        ):
-            is_conflict = True
-            break
-        if (
-            direction not in rules[block]
-            and Direction(relative_direction) in rules[neighbour]
-        ):
-            is_conflict = True
-            break
-
-    if is_conflict:
-        map[x][y] = BlockType.EMPTY
-        return False
-
-    valid_step = True
-    shuffled_directions = np.random.permutation(list(Direction))
-    shuffled_blocks = np.random.permutation(choosalbe_blocks)
-    for possible_direction in shuffled_directions:
-        dx, dy = direction_to_coordinate_change[possible_direction]
-        if (
-            not validate_position(map, x + dx, y + dy)
-            or map[x + dx][y + dy] != BlockType.EMPTY
-        ):
-            continue
-
-        valid_direction = False
-        for shuffled_block in shuffled_blocks:
-            if assign_block(map, x + dx, y + dy, shuffled_block):
-                valid_direction = True
+    Each cell keeps its remaining blocks as a bitset. Narrowing a cell
+    narrows its neighbours through the support table, and so on until
+    nothing changes (arc consistency), so a dead end shows up as an empty
+    domain as soon as it is implied. The next cell decided is one with the
+    fewest blocks left. Decisions and every domain change are kept on
+    explicit stacks, so a contradiction undoes back to the last decision and
+    rules its block out, with no recursion however large the grid.
+
+    domains optionally gives the starting bitset of every cell in row-major
+    order, e.g. to pin cells to blocks.
+    """
+    start_time = time.perf_counter()
+    rng = rng or random.Random()
+    size = height * width
+    if domains is None:
+        domains = [FULL_DOMAIN] * size
+    else:
+        domains = [int(domain) for domain in domains]
+    trail = []  # (cell, domain before the change)
+    # cells by domain size, newest last; entries whose size has since changed
+    # are stale and skipped when popped
+    buckets = [[] for _ in range(len(BlockType) + 1)]
+
+    def propagate(queue):
+        while queue:
+            cell = queue.pop()
+            x, y = divmod(cell, width)
+            domain = domains[cell]
+            for direction, neighbour, inside in (
+                (Direction.NORTH, cell - width, x > 0),
+                (Direction.EAST, cell + 1, y < width - 1),
+                (Direction.SOUTH, cell + width, x < height - 1),
+                (Direction.WEST, cell - 1, y > 0),
+            ):
+                if not inside:
+                    continue
+                old = domains[neighbour]
+                new = old & support[direction][domain]
+                if new == old:
+                    continue
+                if not new:
+                    return False
+                trail.append((neighbour, old))
+                domains[neighbour] = new
+                queue.append(neighbour)
+                buckets[domain_size[new]].append(neighbour)
+        return True
+
+    def restrict(cell, domain):
+        if not domain:
+            return False
+        trail.append((cell, domains[cell]))
+        domains[cell] = domain
+        buckets[domain_size[domain]].append(cell)
+        return propagate([cell])
+
+    def undo(mark):
+        while len(trail) > mark:
+            cell, domain = trail.pop()
+            domains[cell] = domain
+            buckets[domain_size[domain]].append(cell)
+
+    pinned = [cell for cell in range(size) if domains[cell] != FULL_DOMAIN]
+    if any(not domains[cell] for cell in pinned) or not propagate(pinned):
+        return Solution(None, 0, 0, time.perf_counter() - start_time)
+    for cell in pinned:
+        buckets[domain_size[domains[cell]]].append(cell)
+    if not pinned and size:
+        # nothing pinned: grow from a random cell, as the recursive fill did
+        buckets[domain_size[FULL_DOMAIN]].append(rng.randrange(size))
+
+    decisions = []  # (trail length before, cell, block)
+    num_decisions = backtracks = 0
+    scan = 0  # cells before it are decided or queued in a bucket
+    while True:
+        cell = None
+        for count in range(2, len(buckets)):
+            bucket = buckets[count]
+            while bucket:
+                candidate = bucket.pop()
+                if domain_size[domains[candidate]] == count:
+                    cell = candidate
+                    break
+            if cell is not None:
                 break
+        if cell is None:
+            while scan < size and domain_size[domains[scan]] == 1:
+                scan += 1
+            if scan == size:
+                break
+            cell = scan
 
-        if not valid_direction:
-            valid_step = False
-            map[x + dx][y + dy] = BlockType.EMPTY
-            break
-    if not valid_step:
-        map[x][y] = BlockType.EMPTY
-        return False
+        block = rng.choice(domain_blocks[domains[cell]])
+        decisions.append((len(trail), cell, block))
+        num_decisions += 1
+        consistent = restrict(cell, 1 << block)
+        while not consistent:
+            if not decisions:
+                return Solution(
+                    None, num_decisions, backtracks, time.perf_counter() - start_time
+                )
+            mark, cell, block = decisions.pop()
+            undo(mark)
+            backtracks += 1
+            consistent = restrict(cell, domains[cell] & ~(1 << block))
 
-    return True
+    single_block = np.zeros(DOMAINS, dtype=np.int8)
+    for block in choosalbe_blocks:
+        single_block[1 << block] = block
+    tiles = single_block[np.array(domains, dtype=np.int64)].reshape(height, width)
+    return Solution(tiles, num_decisions, backtracks, time.perf_counter() - start_time)
 
 
-def get_neighbour(map, x, y) -> Dict[Direction, BlockType | None]:
-    neighbours = {
-        Direction.NORTH: map[x - 1][y]
-        if validate_position(map, x - 1, y)
-        else None,
-        Direction.EAST: map[x][y + 1]
-        if validate_position(map, x, y + 1)
-        else None,
-        Direction.SOUTH: map[x + 1][y]
-        if validate_position(map, x + 1, y)
-        else None,
-        Direction.WEST: map[x][y - 1]
-        if validate_position(map, x, y - 1)
-        else None,
-    }
+def is_consistent(map) -> bool:
+    # no empty cells, and every opening is matched by the neighbour's
+    map = np.asarray(map)
+    opens = np.zeros((len(BlockType), len(Direction)), dtype=bool)
+    for block, directions in rules.items():
+        opens[block, directions] = True
+    east, west = opens[map[:, :-1], Direction.EAST], opens[map[:, 1:], Direction.WEST]
+    south, north = opens[map[:-1], Direction.SOUTH], opens[map[1:], Direction.NORTH]
+    filled = (map != BlockType.EMPTY).all()
+    return bool(filled and (east == west).all() and (south == north).all())
 
-    return neighbours
 
+def generate_map(
+    width, height, seed=None
+) -> np.ndarray[BlockType, np.dtype[np.int8]] | None:
+    solution = solve_tiles(height, width, random.Random(seed))
+    if solution.tiles is not None:
+        return solution.tiles
 
-def validate_position(map, x, y):
-    return 0 <= x < len(map) and 0 <= y < len(map[0])
+    print('Failed to generate map')
+    return None
 
 
 # map is a 2D array of BlockType
@@ -180,8 +267,21 @@ def print_map(map: np.ndarray[BlockType, np.dtype[np.int8]]) -> None:
 
 
 if __name__ == '__main__':
-    width = 20
-    height = 10
-    map = generate_map(width, height)
-    if map is not None:
-        print_map(map)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--width', type=int, default=20)
+    parser.add_argument('--height', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--quiet', action='store_true', help='skip printing')
+    args = parser.parse_args()
+
+    solution = solve_tiles(args.height, args.width, random.Random(args.seed))
+    if solution.tiles is None:
+        print('Failed to generate map')
+    else:
+        if not args.quiet:
+            print_map(solution.tiles)
+        print(
+            f'{args.height}x{args.width} in {solution.seconds:.2f}s, '
+            f'{solution.decisions:,} decisions, {solution.backtracks:,} backtracks, '
+            f'consistent: {is_consistent(solution.tiles)}'
+        )
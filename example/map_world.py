@@ -0,0 +1,228 @@
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import os
+import random
+import time
+
+import numpy as np
+
+from map_generation_backtracking import (
+    FULL_DOMAIN,
+    Direction,
+    choosalbe_blocks,
+    is_consistent,
+    print_map,
+    rules,
+    solve_tiles,
+)
+
+# chance that a seam cell opens across the seam, about what the solver
+# leaves open between neighbours inside a map
+SEAM_OPENING = 0.65
+
+# opening[direction]: blocks with an opening on that side, as a domain bitset
+opening = [
+    sum(1 << block for block in choosalbe_blocks if direction in rules[block])
+    for direction in Direction
+]
+
+
+def _natural(n):
+    # zigzag, so negative seeds and chunk coordinates can seed a SeedSequence
+    return 2 * n if n >= 0 else -2 * n - 1
+
+
+def seam(seed, kind, chunk_x, chunk_y, length):
+    """Which cells open across one chunk seam, a function of its key alone.
+
+    kind 0 is the seam along the top of chunk (chunk_x, chunk_y), kind 1 the
+    one along its left side. Both chunks on a seam read the same bits, so
+    they agree whichever is generated first, or if the other never is.
+    """
+    entropy = [_natural(seed), kind, _natural(chunk_x), _natural(chunk_y)]
+    rng = np.random.default_rng(entropy)
+    return rng.random(length) < SEAM_OPENING
+
+
+def generate_chunk(seed, chunk_x, chunk_y, size):
+    """Tiles of one size x size chunk, the same for the same key every time.
+
+    The border cells are narrowed to the blocks that open, or stay closed,
+    across each of the four seams, and the inside is left to solve_tiles.
+    Every cell then has two free sides or more, and every set of at least
+    two openings is a block, so a chunk of size 2 or more always solves.
+    """
+    sides = (
+        (Direction.NORTH, seam(seed, 0, chunk_x, chunk_y, size), np.s_[0]),
+        (Direction.SOUTH, seam(seed, 0, chunk_x, chunk_y + 1, size), np.s_[-1]),
+        (Direction.WEST, seam(seed, 1, chunk_x, chunk_y, size), np.s_[:, 0]),
+        (Direction.EAST, seam(seed, 1, chunk_x + 1, chunk_y, size), np.s_[:, -1]),
+    )
+    domains = np.full((size, size), FULL_DOMAIN, dtype=np.int64)
+    for direction, opens, border in sides:
+        domains[border] &= np.where(opens, opening[direction], ~opening[direction])
+
+    entropy = [_natural(seed), 2, _natural(chunk_x), _natural(chunk_y)]
+    rng = random.Random(int(np.random.SeedSequence(entropy).generate_state(1)[0]))
+    solution = solve_tiles(size, size, rng, domains.ravel().tolist())
+    if solution.tiles is None:
+        raise RuntimeError(f"Chunk ({chunk_x}, {chunk_y}) has no solution")
+    return solution.tiles
+
+
+class World:
+    """An unbounded map generated chunk by chunk, as chunks are asked for.
+
+    Chunk (chunk_x, chunk_y) covers columns chunk_x * chunk_size onwards and
+    rows chunk_y * chunk_size onwards, and depends only on the seed and its
+    key, so chunks never wait on their neighbours. Missing chunks are
+    generated on a process pool. Generated chunks are kept in memory, up to
+    memory_chunks, and with a cache_dir also saved there as int8 .npy files,
+    which later runs with the same seed read instead of generating.
+    """
+
+    def __init__(
+        self, seed, chunk_size=64, cache_dir=None, workers=None, memory_chunks=1024
+    ):
+        if chunk_size < 2:
+            raise ValueError("chunk_size should be at least 2")
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.cache_dir = None
+        if cache_dir is not None:
+            self.cache_dir = os.path.join(cache_dir, f"seed{seed}_size{chunk_size}")
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self.workers = workers or os.cpu_count() or 1
+        self.memory_chunks = memory_chunks
+        self.loaded = collections.OrderedDict()  # key -> tiles, oldest first
+        self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def path(self, chunk_x, chunk_y):
+        return os.path.join(self.cache_dir, f"{chunk_x}_{chunk_y}.npy")
+
+    def _remember(self, key, tiles):
+        self.loaded[key] = tiles
+        self.loaded.move_to_end(key)
+        while len(self.loaded) > self.memory_chunks:
+            self.loaded.popitem(last=False)
+
+    def _cached(self, key):
+        if key in self.loaded:
+            self.loaded.move_to_end(key)
+            return self.loaded[key]
+        if self.cache_dir is not None and os.path.exists(self.path(*key)):
+            tiles = np.load(self.path(*key))
+            self._remember(key, tiles)
+            return tiles
+        return None
+
+    def _store(self, key, tiles):
+        if self.cache_dir is not None:
+            path = self.path(*key)
+            np.save(path + ".tmp.npy", tiles)
+            os.replace(path + ".tmp.npy", path)
+        self._remember(key, tiles)
+
+    def chunks(self, keys):
+        """Yield (key, tiles) for every (chunk_x, chunk_y) key.
+
+        Cached chunks come first. The rest are generated a few per worker at
+        a time and yielded in the order asked for.
+        """
+        missing = []
+        for key in dict.fromkeys(keys):
+            tiles = self._cached(key)
+            if tiles is None:
+                missing.append(key)
+            else:
+                yield key, tiles
+
+        if self.workers == 1 or len(missing) == 1:
+            for key in missing:
+                tiles = generate_chunk(self.seed, *key, self.chunk_size)
+                self._store(key, tiles)
+                yield key, tiles
+            return
+
+        if self.pool is None:
+            self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+        pending = collections.deque()
+        missing = iter(missing)
+        while True:
+            for key in itertools.islice(missing, 2 * self.workers - len(pending)):
+                future = self.pool.submit(
+                    generate_chunk, self.seed, *key, self.chunk_size
+                )
+                pending.append((key, future))
+            if not pending:
+                return
+            key, future = pending.popleft()
+            tiles = future.result()
+            self._store(key, tiles)
+            yield key, tiles
+
+    def chunk(self, chunk_x, chunk_y):
+        return next(self.chunks([(chunk_x, chunk_y)]))[1]
+
+    def region(self, x, y, width, height):
+        """Tiles of columns x to x + width and rows y to y + height."""
+        size = self.chunk_size
+        tiles = np.empty((height, width), dtype=np.int8)
+        keys = [
+            (chunk_x, chunk_y)
+            for chunk_y in range(y // size, (y + height - 1) // size + 1)
+            for chunk_x in range(x // size, (x + width - 1) // size + 1)
+        ]
+        for (chunk_x, chunk_y), chunk in self.chunks(keys):
+            # overlap of the chunk and the region, in world coordinates
+            left, top = max(x, chunk_x * size), max(y, chunk_y * size)
+            right = min(x + width, (chunk_x + 1) * size)
+            bottom = min(y + height, (chunk_y + 1) * size)
+            tiles[top - y : bottom - y, left - x : right - x] = chunk[
+                top - chunk_y * size : bottom - chunk_y * size,
+                left - chunk_x * size : right - chunk_x * size,
+            ]
+        return tiles
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--chunks", type=int, default=8, help="n x n chunks to time")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--view",
+        type=int,
+        nargs=4,
+        default=[-10, -5, 20, 10],
+        metavar=("X", "Y", "WIDTH", "HEIGHT"),
+    )
+    args = parser.parse_args()
+
+    with World(args.seed, args.chunk_size, args.cache_dir, args.workers) as world:
+        side = args.chunks * args.chunk_size
+        for attempt in ("first", "again"):
+            start = time.perf_counter()
+            tiles = world.region(-side // 2, -side // 2, side, side)
+            seconds = time.perf_counter() - start
+            print(
+                f"{attempt}: {args.chunks ** 2} chunks ({side}x{side}) in "
+                f"{seconds:.2f}s, {args.chunks ** 2 / seconds:,.1f} chunks/s, "
+                f"consistent across seams: {is_consistent(tiles)}"
+            )
+        print_map(world.region(*args.view))
@@ -0,0 +1,203 @@
+import argparse
+import math
+import time
+
+import numpy as np
+
+from matrix_completion_data import Ratings
+
+# float64 elements per temporary while summing the normal equations
+CHUNK = 1 << 20
+
+
+def rating_targets(values, margin=0.05):
+    """Scores whose 5 * sigmoid is the rating, clipped off the asymptotes.
+
+    The model's score before the sigmoid is linear in M, so least squares on
+    these targets has a closed form.
+    """
+    fraction = np.clip(np.asarray(values, dtype=np.float64) / 5, margin, 1 - margin)
+    return np.log(fraction / (1 - fraction))
+
+
+def solve_side(features, ids, other_vectors, other_ids, targets, reg):
+    """Least squares for X in score = f^T X g, one side's vectors held fixed.
+
+    features are the (n, d) feature rows of the side being solved and
+    other_vectors the fixed (m, r) vectors of the other side, ids and
+    other_ids index them per observed pair. The normal equations are summed
+    per entity rather than per pair:
+
+        A = sum_e (f_e f_e^T) kron (sum_{pairs of e} g g^T)
+        b = sum_e f_e kron (sum_{pairs of e} z g)
+
+    which turns the (d r)^2 work per pair into r^2 per pair plus one GEMM
+    over entities. Returns X as (d, r).
+    """
+    dim, rank = features.shape[1], other_vectors.shape[1]
+    order = np.argsort(ids, kind="stable")
+    ids, other_ids, targets = ids[order], other_ids[order], targets[order]
+
+    A = np.zeros((dim * dim, rank * rank))
+    b = np.zeros((dim, rank))
+    width = max(rank * rank, dim * dim)
+    # pairs per chunk: bounds the (pairs, width) temporaries and the
+    # (entities, pairs) membership matrix below alike
+    step = max(1, min(CHUNK // width, math.isqrt(CHUNK)))
+    # per-entity rows are buffered so A takes one large GEMM per flush
+    # instead of a small one per chunk
+    buffered_f, buffered_gram = [], []
+    num_buffered = 0
+
+    def flush():
+        f = np.concatenate(buffered_f)
+        outer = (f[:, :, None] * f[:, None, :]).reshape(len(f), dim * dim)
+        A[:] += outer.T @ np.concatenate(buffered_gram)
+        buffered_f.clear()
+        buffered_gram.clear()
+
+    for start in range(0, len(ids), step):
+        chunk_ids = ids[start : start + step]
+        # entities in the chunk; one cut by the chunk boundary is simply
+        # summed in two parts
+        starts = np.diff(chunk_ids, prepend=-1) != 0
+        heads = np.flatnonzero(starts)
+        # (entities, pairs) 0/1 matrix: per-entity sums become one GEMM,
+        # several times faster than np.add.reduceat over r^2-wide rows
+        member = np.zeros((len(heads), len(chunk_ids)))
+        member[np.cumsum(starts) - 1, np.arange(len(chunk_ids))] = 1
+        g = other_vectors[other_ids[start : start + step]].astype(np.float64)
+        z = targets[start : start + step]
+        gram = member @ np.einsum("pi,pj->pij", g, g).reshape(len(g), rank * rank)
+        weighted = member @ (z[:, None] * g)
+        f = features[chunk_ids[heads]].astype(np.float64)
+        b += f.T @ weighted
+        buffered_f.append(f)
+        buffered_gram.append(gram)
+        num_buffered += len(f)
+        if num_buffered >= step:
+            flush()
+            num_buffered = 0
+    if buffered_f:
+        flush()
+
+    # A[(a, b), (i, j)] -> A[(a, i), (b, j)] to match X flattened row-major
+    A = A.reshape(dim, dim, rank, rank).transpose(0, 2, 1, 3)
+    A = A.reshape(dim * rank, dim * rank)
+    A[np.diag_indices_from(A)] += reg
+    return np.linalg.solve(A, b.ravel()).reshape(dim, rank)
+
+
+def predict_pairs(user_features, item_features, ratings, M):
+    # predicted rating of every observed pair, for M or its factors (W, H)
+    if isinstance(M, tuple):
+        W, H = M
+        user_vectors, item_vectors = user_features @ W, item_features @ H
+    else:
+        user_vectors, item_vectors = user_features @ M, item_features
+    scores = np.einsum(
+        "br,br->b", user_vectors[ratings.users], item_vectors[ratings.items]
+    )
+    return 5 / (1 + np.exp(-scores))
+
+
+def rmse(user_features, item_features, ratings, M):
+    errors = predict_pairs(user_features, item_features, ratings, M) - ratings.values
+    return float(np.sqrt(np.mean(errors**2)))
+
+
+def fit(
+    user_features,
+    item_features,
+    ratings,
+    rank=None,
+    reg=0.1,
+    iterations=10,
+    seed=0,
+    verbose=False,
+):
+    """Fit M, or W and H with M = W H^T, by regularized least squares.
+
+    Without a rank M has a closed form: one solve of a (d_u d_i)-square
+    system. With a rank, W and H are found by alternating least squares,
+    each half step a (d r)-square solve with the other factor fixed.
+    Returns M or (W, H) as float32, ready for
+    MatrixCompletionModel.set_interaction or matrix_completion_topk.
+    """
+    user_features = np.asarray(user_features, dtype=np.float64)
+    item_features = np.asarray(item_features, dtype=np.float64)
+    targets = rating_targets(ratings.values)
+    if rank is None:
+        M = solve_side(
+            user_features, ratings.users, item_features, ratings.items, targets, reg
+        )
+        if verbose:
+            error = rmse(user_features, item_features, ratings, M)
+            print(f"Closed form, RMSE: {error:.4f}")
+        return M.astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    H = rng.standard_normal((item_features.shape[1], rank)) / np.sqrt(rank)
+    for iteration in range(iterations):
+        item_vectors = item_features @ H
+        W = solve_side(
+            user_features, ratings.users, item_vectors, ratings.items, targets, reg
+        )
+        user_vectors = user_features @ W
+        H = solve_side(
+            item_features, ratings.items, user_vectors, ratings.users, targets, reg
+        )
+        if verbose:
+            error = rmse(user_features, item_features, ratings, (W, H))
+            print(f"Iteration [{iteration + 1}/{iterations}], RMSE: {error:.4f}")
+    return W.astype(np.float32), H.astype(np.float32)
+
+
+def synthetic_ratings(num_users, num_items, dim, rank, num_ratings, seed=0):
+    # ratings drawn from a rank-limited bilinear model plus noise
+    rng = np.random.default_rng(seed)
+    user_features = rng.standard_normal((num_users, dim), np.float32)
+    item_features = rng.standard_normal((num_items, dim), np.float32)
+    W = rng.standard_normal((dim, rank)) / dim**0.5
+    H = rng.standard_normal((dim, rank)) / rank**0.5
+    users = rng.integers(num_users, size=num_ratings)
+    items = rng.integers(num_items, size=num_ratings)
+    scores = np.einsum(
+        "br,br->b", (user_features @ W)[users], (item_features @ H)[items]
+    )
+    scores += rng.normal(scale=0.3, size=num_ratings)
+    values = np.clip(np.rint(5 / (1 + np.exp(-scores)) + 0.5), 1, 5)
+    ratings = Ratings(users, items, values.astype(np.float32))
+    return user_features, item_features, ratings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=32)
+    parser.add_argument("--ratings", type=int, default=1000000)
+    parser.add_argument("--rank", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--reg", type=float, default=0.1)
+    args = parser.parse_args()
+
+    user_features, item_features, ratings = synthetic_ratings(
+        args.users, args.items, args.dim, args.rank, args.ratings
+    )
+    for rank in (None, args.rank):
+        start = time.perf_counter()
+        M = fit(
+            user_features,
+            item_features,
+            ratings,
+            rank,
+            args.reg,
+            args.iterations,
+            verbose=True,
+        )
+        print(
+            f"{'dense' if rank is None else f'rank {rank}'}: "
+            f"{time.perf_counter() - start:.2f}s, "
+            f"RMSE {rmse(user_features, item_features, ratings, M):.4f}"
+        )
@@ -0,0 +1,80 @@
+import argparse
+import time
+
+import numpy as np
+
+from matrix_completion_topk import recommend
+
+
+def pair_scores(user_x, item_x, M):
+    # the model's per-pair score u^T M v, for a dense M or factors (W, H)
+    if isinstance(M, tuple):
+        W, H = M
+        return np.einsum("br,br->b", user_x @ W, item_x @ H)
+    return np.einsum("bi,bi->b", user_x @ M, item_x)
+
+
+def benchmark(
+    ranks,
+    user_dim=2048,
+    item_dim=2048,
+    num_pairs=16384,
+    num_users=2000,
+    num_items=20000,
+    k=10,
+    seed=0,
+):
+    """Parameter memory and scoring throughput of dense M against W H^T.
+
+    pairs/s is the per-pair score the model trains on. users/s is top-k
+    recommendation over num_items. Rank None is the dense d_u x d_i matrix.
+    """
+    rng = np.random.default_rng(seed)
+    user_x = rng.standard_normal((num_pairs, user_dim), np.float32)
+    item_x = rng.standard_normal((num_pairs, item_dim), np.float32)
+    user_features = rng.standard_normal((num_users, user_dim), np.float32)
+    item_features = rng.standard_normal((num_items, item_dim), np.float32)
+
+    print(f"{'rank':>6}{'params MiB':>12}{'pairs/s':>14}{'top-k users/s':>16}")
+    for rank in ranks:
+        if rank is None:
+            M = rng.standard_normal((user_dim, item_dim), np.float32)
+            num_params = M.size
+        else:
+            W = rng.standard_normal((user_dim, rank), np.float32)
+            H = rng.standard_normal((item_dim, rank), np.float32)
+            M = (W, H)
+            num_params = W.size + H.size
+
+        start = time.perf_counter()
+        pair_scores(user_x, item_x, M)
+        pairs_per_second = num_pairs / (time.perf_counter() - start)
+        result = recommend(user_features, item_features, M, k)
+        print(
+            f"{'dense' if rank is None else rank:>6}"
+            f"{num_params * 4 / 2**20:>12.1f}{pairs_per_second:>14,.0f}"
+            f"{result.users_per_second:>16,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ranks", type=int, nargs="+", default=[8, 32, 128, 512])
+    parser.add_argument("--user-dim", type=int, default=2048)
+    parser.add_argument("--item-dim", type=int, default=2048)
+    parser.add_argument("--pairs", type=int, default=16384)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--no-dense", action="store_true")
+    args = parser.parse_args()
+    ranks = ([] if args.no_dense else [None]) + args.ranks
+    benchmark(
+        ranks,
+        args.user_dim,
+        args.item_dim,
+        args.pairs,
+        args.users,
+        args.items,
+        args.k,
+    )
@@ -0,0 +1,132 @@
+import argparse
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Recommendations(NamedTuple):
+    items: np.ndarray  # (U, k) item rows, best first
+    ratings: np.ndarray  # (U, k) predicted ratings, 5 * sigmoid(score)
+    seconds: float
+    users_per_second: float
+
+
+def top_k_scores(user_vectors, item_vectors, k, user_block=256, item_chunk=4096):
+    """Best k items per user by the dot product of their vectors.
+
+    Users are taken a block at a time and items a chunk at a time, so each
+    step is one (user_block, dim) x (dim, item_chunk) GEMM whose result fits
+    in cache, and nothing larger than that is ever held. Each user keeps a
+    running top k. Once the first chunks have raised every user's k-th best
+    score, few of a chunk's scores beat it, and only those are merged in.
+    """
+    num_users, num_items = len(user_vectors), len(item_vectors)
+    k = min(k, num_items)
+    best_items = np.empty((num_users, k), dtype=np.int64)
+    best_scores = np.empty((num_users, k), dtype=np.float32)
+    scores = np.empty((min(user_block, num_users), item_chunk), dtype=np.float32)
+    for start in range(0, num_users, user_block):
+        block = user_vectors[start : start + user_block]
+        size = len(block)
+        rows = np.arange(size)
+        top_items = np.full((size, k), -1, dtype=np.int64)
+        top_scores = np.full((size, k), -np.inf, dtype=np.float32)
+        for first in range(0, num_items, item_chunk):
+            chunk = item_vectors[first : first + item_chunk]
+            chunk_scores = scores[:size, : len(chunk)]
+            np.matmul(block, chunk.T, out=chunk_scores)
+            hits = chunk_scores > top_scores.min(axis=1)[:, None]
+            num_hits = np.count_nonzero(hits)
+            if not num_hits:
+                continue
+
+            if num_hits > size * k:
+                # most of the chunk qualifies: take its own top k per user
+                # and partition those against the running ones
+                columns = np.broadcast_to(np.arange(len(chunk)), (size, len(chunk)))
+                if len(chunk) > k:
+                    columns = np.argpartition(chunk_scores, -k, axis=1)[:, -k:]
+                candidate_scores = np.concatenate(
+                    [top_scores, chunk_scores[rows[:, None], columns]], axis=1
+                )
+                candidate_items = np.concatenate([top_items, columns + first], axis=1)
+                keep = np.argpartition(candidate_scores, -k, axis=1)[:, -k:]
+                top_scores = candidate_scores[rows[:, None], keep]
+                top_items = candidate_items[rows[:, None], keep]
+                continue
+
+            # a few hits: sort each user's running top k together with its
+            # hits, best first, and keep the first k of every user
+            # (flatnonzero is several times faster than a 2-D nonzero)
+            hit_rows, hit_columns = np.divmod(np.flatnonzero(hits), len(chunk))
+            candidate_rows = np.concatenate([np.repeat(rows, k), hit_rows])
+            candidate_scores = np.concatenate(
+                [top_scores.ravel(), chunk_scores[hit_rows, hit_columns]]
+            )
+            candidate_items = np.concatenate([top_items.ravel(), hit_columns + first])
+            order = np.lexsort((-candidate_scores, candidate_rows))
+            counts = k + np.bincount(hit_rows, minlength=size)
+            keep = order[(np.cumsum(counts) - counts)[:, None] + np.arange(k)]
+            top_scores = candidate_scores[keep]
+            top_items = candidate_items[keep]
+
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        best_scores[start : start + size] = top_scores[rows[:, None], order]
+        best_items[start : start + size] = top_items[rows[:, None], order]
+    return best_items, best_scores
+
+
+def recommend(user_features, item_features, M, k=10, **chunking):
+    """Top k items for every user under the bilinear model u^T M v.
+
+    M is the (d_u, d_i) matrix, or its factors (W, H) with M = W H^T. The
+    user projections u^T M, or u^T W and v^T H, are computed once, so each
+    item chunk only costs one GEMM against them. The sigmoid is monotonic,
+    so ranking uses the raw scores and only the k kept per user are turned
+    into ratings.
+    """
+    start = time.perf_counter()
+    user_features = np.asarray(user_features, dtype=np.float32)
+    item_features = np.asarray(item_features, dtype=np.float32)
+    if isinstance(M, tuple):
+        W, H = (np.asarray(factor, dtype=np.float32) for factor in M)
+        user_vectors, item_vectors = user_features @ W, item_features @ H
+    else:
+        user_vectors = user_features @ np.asarray(M, dtype=np.float32)
+        item_vectors = item_features
+    items, scores = top_k_scores(user_vectors, item_vectors, k, **chunking)
+    ratings = 5 / (1 + np.exp(-scores))
+    seconds = time.perf_counter() - start
+    return Recommendations(items, ratings, seconds, len(items) / seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--user-dim", type=int, default=32)
+    parser.add_argument("--item-dim", type=int, default=32)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--user-block", type=int, default=256)
+    parser.add_argument("--item-chunk", type=int, default=4096)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    user_features = rng.standard_normal((args.users, args.user_dim), np.float32)
+    item_features = rng.standard_normal((args.items, args.item_dim), np.float32)
+    M = rng.standard_normal((args.user_dim, args.item_dim), np.float32) * 0.1
+
+    result = recommend(
+        user_features,
+        item_features,
+        M,
+        args.k,
+        user_block=args.user_block,
+        item_chunk=args.item_chunk,
+    )
+    print(
+        f"top {args.k} of {args.items:,} items for {args.users:,} users "
+        f"in {result.seconds:.2f}s: {result.users_per_second:,.0f} users/s"
+    )
+    print("user 0:", result.items[0], np.round(result.ratings[0], 3))
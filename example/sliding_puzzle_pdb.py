@@ -0,0 +1,314 @@
+"""IDA* over additive disjoint pattern databases for N x N sliding puzzles.
+
+The default 4x4 partition is 5-5-5, whose databases build in about 90s with
+the pure-Python builder here. It does not reach sub-second 15-puzzles: on
+random solvable boards the median solve is about 0.6s, and the hardest take
+up to about 70s. Getting under a second needs 6-6-3 or 7-8 databases, which
+this builder would take hours to produce, so they are not the default.
+Tables built elsewhere can be passed to IDAStar through patterns= and
+tables=.
+"""
+
+import mmap
+import os
+import sys
+import time
+
+from eight_puzzle_search import SearchResult, is_solvable, print_board
+
+PDB_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "pattern_databases"
+)
+UNSEEN = 0xFF
+
+# disjoint tile groups whose databases are summed, keyed by board width
+DEFAULT_PATTERNS = {
+    3: [(1, 2, 3, 4), (5, 6, 7, 8)],
+    4: [(1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)],
+    5: [
+        (1, 2, 5, 6),
+        (3, 4, 8, 9),
+        (7, 11, 12, 16),
+        (10, 14, 15, 20),
+        (13, 17, 18, 22),
+        (19, 21, 23, 24),
+    ],
+}
+
+
+def default_goal(n):
+    # tiles in reading order with the blank in the last cell
+    return [[(i * n + j + 1) % (n * n) for j in range(n)] for i in range(n)]
+
+
+def neighbours(n):
+    result = []
+    for cell in range(n * n):
+        i, j = divmod(cell, n)
+        cells = []
+        for di, dj in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            if 0 <= i + di < n and 0 <= j + dj < n:
+                cells.append((i + di) * n + j + dj)
+        result.append(cells)
+    return result
+
+
+def build_pattern_database(n, goal, pattern):
+    """Moves needed to bring the pattern tiles home, counting only their moves.
+
+    Entry sum(cell_i * size**i) holds the distance for pattern tile i sitting
+    on cell_i. Moves of other tiles are free, which keeps disjoint databases
+    additive.
+    """
+    size = n * n
+    k = len(pattern)
+    powers = [size**i for i in range(k)]
+    goal_flat = [tile for row in goal for tile in row]
+    start = sum(goal_flat.index(tile) * powers[i] for i, tile in enumerate(pattern))
+    adjacent = neighbours(n)
+
+    table = bytearray([UNSEEN]) * size**k
+    seen = bytearray(size ** (k + 1))
+
+    def occupied(index):
+        cells = {}
+        for i in range(k):
+            index, cell = divmod(index, size)
+            cells[cell] = i
+        return cells
+
+    current = [start * size + goal_flat.index(0)]
+    distance = 0
+    while current:
+        # free blank moves first, then every pattern tile move costs one
+        level = []
+        stack = current
+        while stack:
+            state = stack.pop()
+            if seen[state]:
+                continue
+            seen[state] = 1
+            level.append(state)
+            index, blank = divmod(state, size)
+            if table[index] == UNSEEN:
+                table[index] = distance
+            cells = occupied(index)
+            for cell in adjacent[blank]:
+                if cell not in cells and not seen[index * size + cell]:
+                    stack.append(index * size + cell)
+
+        current = []
+        for state in level:
+            index, blank = divmod(state, size)
+            for cell, i in occupied(index).items():
+                if cell in adjacent[blank]:
+                    child = (index + (blank - cell) * powers[i]) * size + cell
+                    if not seen[child]:
+                        current.append(child)
+        distance += 1
+    return table
+
+
+def database_path(n, number, directory=PDB_DIR, goal=None):
+    # databases for a goal other than default_goal(n) are named after it
+    name = f"pdb_{n}x{n}_{number}"
+    if goal is not None and goal != default_goal(n):
+        name += "_" + "-".join(str(tile) for row in goal for tile in row)
+    return os.path.join(directory, name + ".bin")
+
+
+def build_databases(n, goal=None, patterns=None, directory=PDB_DIR):
+    goal = goal or default_goal(n)
+    patterns = patterns or DEFAULT_PATTERNS[n]
+    os.makedirs(directory, exist_ok=True)
+    for number, pattern in enumerate(patterns):
+        table = build_pattern_database(n, goal, pattern)
+        path = database_path(n, number, directory, goal)
+        with open(path + ".tmp", "wb") as f:
+            f.write(table)
+        os.replace(path + ".tmp", path)
+
+
+def load_databases(n, patterns=None, directory=PDB_DIR, goal=None):
+    patterns = patterns or DEFAULT_PATTERNS[n]
+    tables = []
+    for number, pattern in enumerate(patterns):
+        with open(database_path(n, number, directory, goal), "rb") as f:
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(table) != (n * n) ** len(pattern):
+            raise ValueError(f"Pattern database {number} does not match {pattern}")
+        tables.append(table)
+    return tables
+
+
+class IDAStar:
+    """IDA* over additive disjoint pattern databases for N x N puzzles.
+
+    The search keeps one running index per database and adjusts only the
+    moved tile's term, so a heuristic update is a few table reads and no
+    allocation.
+    """
+
+    def __init__(self, n, goal=None, patterns=None, tables=None, directory=PDB_DIR):
+        self.n = n
+        self.size = n * n
+        self.goal = goal or default_goal(n)
+        self.patterns = patterns or DEFAULT_PATTERNS[n]
+        covered = sorted(tile for pattern in self.patterns for tile in pattern)
+        if covered != list(range(1, self.size)):
+            raise ValueError("The patterns must cover every tile exactly once")
+        self.tables = tables or load_databases(
+            n, self.patterns, directory, self.goal
+        )
+        self.adjacent = neighbours(n)
+
+        # tile -> (database number, weight of the tile inside that index)
+        self.pattern_of = [0] * self.size
+        self.weight = [0] * self.size
+        for number, pattern in enumerate(self.patterns):
+            for i, tile in enumerate(pattern):
+                self.pattern_of[tile] = number
+                self.weight[tile] = self.size**i
+
+        # Transposing the board and relabelling tiles maps the goal onto
+        # itself when the blank's goal cell is on the diagonal, so the same
+        # databases give a second lower bound for the mirrored board. The
+        # mirrored indices live after the direct ones.
+        goal_flat = [tile for row in self.goal for tile in row]
+        self.transpose = [(cell % n) * n + cell // n for cell in range(self.size)]
+        blank = goal_flat.index(0)
+        self.mirrored = self.transpose[blank] == blank
+        count = len(self.patterns)
+        self.mirror_pattern = [count] * self.size
+        self.mirror_weight = [0] * self.size
+        if self.mirrored:
+            for cell, tile in enumerate(goal_flat):
+                if tile:
+                    image = goal_flat[self.transpose[cell]]
+                    self.mirror_pattern[tile] = count + self.pattern_of[image]
+                    self.mirror_weight[tile] = self.weight[image]
+        # a zero-filled table absorbs the mirror terms when they are unused
+        self.lookup = list(self.tables) * 2 if self.mirrored else list(self.tables)
+        if not self.mirrored:
+            self.lookup.append(bytes(1))
+
+    def indices(self, flat):
+        indices = [0] * len(self.lookup)
+        for cell, tile in enumerate(flat):
+            if tile:
+                indices[self.pattern_of[tile]] += cell * self.weight[tile]
+                indices[self.mirror_pattern[tile]] += (
+                    self.transpose[cell] * self.mirror_weight[tile]
+                )
+        return indices
+
+    def solve(self, board, verbose=False):
+        if not is_solvable(board, self.goal):
+            return SearchResult(None, 0, 0)
+        flat = [tile for row in board for tile in row]
+        indices = self.indices(flat)
+        tables, adjacent = self.lookup, self.adjacent
+        pattern_of, weight = self.pattern_of, self.weight
+        mirror_pattern, mirror_weight = self.mirror_pattern, self.mirror_weight
+        transpose = self.transpose
+        path = []
+        expanded = 0
+        next_bound = 0
+
+        def search(g, bound, blank, previous, h, mirror_h):
+            nonlocal expanded, next_bound
+            f = g + (h if h > mirror_h else mirror_h)
+            if f > bound:
+                if f < next_bound:
+                    next_bound = f
+                return False
+            expanded += 1
+            if h == 0:
+                return True
+            for cell in adjacent[blank]:
+                if cell == previous:
+                    continue
+                tile = flat[cell]
+                number = pattern_of[tile]
+                table = tables[number]
+                index = indices[number]
+                child_index = index + (blank - cell) * weight[tile]
+                child_h = h - table[index] + table[child_index]
+
+                mirror_number = mirror_pattern[tile]
+                table = tables[mirror_number]
+                mirror_index = indices[mirror_number]
+                mirror_child = mirror_index + (
+                    transpose[blank] - transpose[cell]
+                ) * mirror_weight[tile]
+                child_mirror_h = mirror_h - table[mirror_index] + table[mirror_child]
+
+                flat[blank], flat[cell] = tile, 0
+                indices[number] = child_index
+                indices[mirror_number] = mirror_child
+                path.append(cell)
+                if search(g + 1, bound, cell, blank, child_h, child_mirror_h):
+                    return True
+                path.pop()
+                indices[number] = index
+                indices[mirror_number] = mirror_index
+                flat[blank], flat[cell] = 0, tile
+            return False
+
+        start_blank = flat.index(0)
+        count = len(self.patterns)
+        h = sum(tables[number][indices[number]] for number in range(count))
+        mirror_h = sum(
+            tables[number][indices[number]]
+            for number in range(count, len(tables))
+        )
+        bound = max(h, mirror_h)
+        while True:
+            next_bound = float("inf")
+            if verbose:
+                print("Bound: ", bound, "Expanded: ", expanded)
+            if search(0, bound, start_blank, -1, h, mirror_h):
+                break
+            bound = next_bound
+
+        # replay the blank moves to recover the boards
+        flat = [tile for row in board for tile in row]
+        blank = start_blank
+        boards = [board]
+        for cell in path:
+            flat[blank], flat[cell] = flat[cell], 0
+            blank = cell
+            boards.append([flat[i * self.n : (i + 1) * self.n] for i in range(self.n)])
+        return SearchResult(boards, expanded, len(path) + 1)
+
+
+if __name__ == "__main__":
+    # usage: python sliding_puzzle_pdb.py N [--build]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    if "--build" in sys.argv[2:]:
+        start = time.perf_counter()
+        build_databases(n)
+        print(f"Built {n}x{n} pattern databases in {time.perf_counter() - start:.1f}s")
+        sys.exit(0)
+
+    init = {
+        3: [[8, 6, 7], [2, 5, 4], [3, 0, 1]],
+        4: [[2, 13, 11, 1], [3, 14, 5, 8], [10, 6, 15, 7], [4, 0, 12, 9]],
+        5: [
+            [2, 6, 8, 3, 5],
+            [1, 7, 13, 4, 10],
+            [18, 21, 24, 9, 19],
+            [16, 11, 22, 15, 20],
+            [12, 23, 0, 17, 14],
+        ],
+    }[n]
+    solver = IDAStar(n)
+    start = time.perf_counter()
+    result = solver.solve(init)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Solved in {len(result.path) - 1} moves, {result.expanded} nodes expanded, "
+        f"{elapsed:.2f}s"
+    )
+    for board in result.path:
+        print_board(board)